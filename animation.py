@@ -4,64 +4,159 @@ from board import BOARD_OFFSET_X, BOARD_OFFSET_Y, CELL_SIZE, BOARD_SIZE
 ANIM_DURATION = 1000  # 1 second
 ANIM_COLOR = (0, 255, 0)  # bright green overlay
 
+# The fade is drawn with this many precomputed alpha levels (about two
+# frames per level at 30 fps), from nearly opaque down to nearly clear.
+FADE_STEPS = 16
+FADE_ALPHAS = [
+    round(255 * (1 - (step + 0.5) / FADE_STEPS)) for step in range(FADE_STEPS)
+]
 
-def draw_animation_event(win, event, current_time):
-    """Draw a fading overlay if the animation is still active."""
-    elapsed = current_time - event["start_time"]
-    if elapsed > event["duration"]:
-        return False
-    alpha = int(255 * (1 - elapsed / event["duration"]))
-    overlay = pygame.Surface((event["width"], event["height"]), pygame.SRCALPHA)
-    overlay.fill((ANIM_COLOR[0], ANIM_COLOR[1], ANIM_COLOR[2], alpha))
-    win.blit(overlay, (event["x"], event["y"]))
-    return True
+# Overlay sizes of a cell, a row, a column and a box, built by warm_fade_frames()
+ANIM_SIZES = (
+    (CELL_SIZE, CELL_SIZE),
+    (BOARD_SIZE, CELL_SIZE),
+    (CELL_SIZE, BOARD_SIZE),
+    (3 * CELL_SIZE, 3 * CELL_SIZE),
+)
 
+_fade_frames = {}
 
-def check_number_animation(board, animated_numbers, current_time):
+
+def fade_frames(size):
+    """The FADE_STEPS overlay surfaces of one size, built on first use."""
+    frames = _fade_frames.get(size)
+    if frames is None:
+        frames = []
+        for alpha in FADE_ALPHAS:
+            surf = pygame.Surface(size, pygame.SRCALPHA)
+            surf.fill((*ANIM_COLOR, alpha))
+            frames.append(surf)
+        _fade_frames[size] = frames
+    return frames
+
+
+def warm_fade_frames():
+    """Build the frames of every overlay size now, so no animation allocates them."""
+    for size in ANIM_SIZES:
+        fade_frames(size)
+
+
+class Animation:
+    """
+    A fading overlay over one screen rectangle.
+
+    The surfaces it shows come from fade_frames(), and `blit` is the
+    [surface, position] pair the Timeline hands to win.blits(), updated in
+    place each frame, so a running animation allocates nothing.
+    """
+
+    __slots__ = ("kind", "index", "rect", "start_time", "duration", "frames", "blit")
+
+    def __init__(self, kind, index, rect, start_time, duration=ANIM_DURATION):
+        self.kind = kind
+        self.index = index
+        self.rect = pygame.Rect(rect)
+        self.start_time = start_time
+        self.duration = duration
+        self.frames = fade_frames(self.rect.size)
+        self.blit = [self.frames[0], self.rect.topleft]
+
+    def step(self, current_time):
+        """Select the frame for current_time. Returns False once the fade is over."""
+        elapsed = current_time - self.start_time
+        if elapsed > self.duration:
+            return False
+        self.blit[0] = self.frames[
+            min(elapsed * FADE_STEPS // self.duration, FADE_STEPS - 1)
+        ]
+        return True
+
+
+class Timeline:
+    """
+    The running animations, advanced and drawn once per frame.
+
+    update() drops finished animations (compacting the list in place) and
+    returns the regions the overlays covered, including those that just
+    ended, so the board under them can be redrawn. draw() then blits every
+    overlay in one win.blits() call. The lists are reused between frames.
+    """
+
+    __slots__ = ("_active", "_batch", "_dirty")
+
+    def __init__(self):
+        self._active = []
+        self._batch = []
+        self._dirty = []
+
+    def __len__(self):
+        return len(self._active)
+
+    def add(self, animation):
+        self._active.append(animation)
+
+    def extend(self, animations):
+        self._active.extend(animations)
+
+    def clear(self):
+        self._active.clear()
+        self._batch.clear()
+
+    def update(self, current_time):
+        """
+        Advance every animation to current_time. Returns the screen rects
+        drawn last frame or this one (valid until the next update).
+        """
+        active, batch, dirty = self._active, self._batch, self._dirty
+        batch.clear()
+        dirty.clear()
+        kept = 0
+        for anim in active:
+            dirty.append(anim.rect)
+            if anim.step(current_time):
+                active[kept] = anim
+                batch.append(anim.blit)
+                kept += 1
+        del active[kept:]
+        return dirty
+
+    def draw(self, win):
+        """Blit the overlays selected by the last update()."""
+        if self._batch:
+            win.blits(self._batch, doreturn=False)
+
+
+def unit_animation_event(kind, index, current_time):
+    """
+    Create the overlay animation for a completed unit.
+    kind is "row", "col" or "box"; for boxes index is (box_row, box_col).
+    """
+    if kind == "row":
+        x, y = BOARD_OFFSET_X, BOARD_OFFSET_Y + index * CELL_SIZE
+        width, height = BOARD_SIZE, CELL_SIZE
+    elif kind == "col":
+        x, y = BOARD_OFFSET_X + index * CELL_SIZE, BOARD_OFFSET_Y
+        width, height = CELL_SIZE, BOARD_SIZE
+    else:
+        box_row, box_col = index
+        x = BOARD_OFFSET_X + box_col * 3 * CELL_SIZE
+        y = BOARD_OFFSET_Y + box_row * 3 * CELL_SIZE
+        width = height = 3 * CELL_SIZE
+    return Animation(kind, index, (x, y, width, height), current_time)
+
+
+def number_animation_events(board, num, current_time):
     """
-    If a digit (1..9) appears at least once in *every* 3x3 sub-grid,
-    create an animation for each cell containing that digit.
+    Create an animation for each cell containing num, once every
+    occurrence of that digit has been placed correctly.
     """
     events = []
-    for num in range(1, 10):
-        if num in animated_numbers:
-            continue
-        # Check each 3x3 box for at least one 'num'
-        all_boxes = True
-        for box_row in range(3):
-            for box_col in range(3):
-                found = False
-                for i in range(box_row * 3, box_row * 3 + 3):
-                    for j in range(box_col * 3, box_col * 3 + 3):
-                        if board.cells[i][j].value == num:
-                            found = True
-                            break
-                    if found:
-                        break
-                if not found:
-                    all_boxes = False
-                    break
-            if not all_boxes:
-                break
-
-        if all_boxes:
-            # Animate every cell that has this number
-            for i in range(9):
-                for j in range(9):
-                    if board.cells[i][j].value == num:
-                        x = BOARD_OFFSET_X + j * CELL_SIZE
-                        y = BOARD_OFFSET_Y + i * CELL_SIZE
-                        events.append(
-                            {
-                                "type": "number",
-                                "number": num,
-                                "start_time": current_time,
-                                "duration": ANIM_DURATION,
-                                "x": x,
-                                "y": y,
-                                "width": CELL_SIZE,
-                                "height": CELL_SIZE,
-                            }
-                        )
-            animated_numbers.add(num)
+    for i in range(9):
+        for j in range(9):
+            if board.cells[i][j].value == num:
+                x = BOARD_OFFSET_X + j * CELL_SIZE
+                y = BOARD_OFFSET_Y + i * CELL_SIZE
+                events.append(
+                    Animation("number", num, (x, y, CELL_SIZE, CELL_SIZE), current_time)
+                )
     return events
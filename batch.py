@@ -0,0 +1,158 @@
+"""
+Generate puzzles in bulk across all cores.
+
+    python3 batch.py -n 1000 -o puzzles.txt
+    python3 batch.py -n 200 -d hard --seed 7 --workers 4
+    python3 batch.py -n 1000 --dedup puzzles.index -o more.txt
+
+Each output line is "<difficulty> <puzzle> <solution>", with both grids as
+81-character strings ('0' for empty cells). Lines are written as soon as
+their chunk finishes, so the order varies between runs, but the set of
+puzzles for a given seed does not depend on the number of workers. With
+--dedup, puzzles equivalent under symmetry to one already in the index
+(see canonical.py) are skipped as they arrive.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from generator import DIFFICULTY_REMOVALS, generate_puzzle
+from solver import format_puzzle
+
+CHUNK_SIZE = 25
+
+
+def chunk_rng(seed, difficulty, chunk):
+    """Independent, reproducible RNG for one chunk of work."""
+    return random.Random(f"{seed}:{difficulty}:{chunk}")
+
+
+def generate_chunk(seed, difficulty, chunk, count):
+    """Worker entry point: generate `count` puzzles and return them as output lines."""
+    rng = chunk_rng(seed, difficulty, chunk)
+    lines = []
+    for _ in range(count):
+        puzzle, solution = generate_puzzle(difficulty, rng)
+        lines.append(
+            f"{difficulty} {format_puzzle(puzzle)} {format_puzzle(solution)}\n"
+        )
+    return lines
+
+
+def generate_keyed_chunk(seed, difficulty, chunk, count):
+    """Like generate_chunk, but pairs each line with its puzzle's canonical key
+    so the parent can drop duplicates."""
+    from canonical import canonical_key
+
+    lines = generate_chunk(seed, difficulty, chunk, count)
+    return [(line, canonical_key(line.split()[1])) for line in lines]
+
+
+def plan_chunks(count, difficulties, chunk_size=CHUNK_SIZE):
+    """Split `count` puzzles per difficulty into (difficulty, chunk, size) jobs."""
+    jobs = []
+    for difficulty in difficulties:
+        for chunk, start in enumerate(range(0, count, chunk_size)):
+            jobs.append((difficulty, chunk, min(chunk_size, count - start)))
+    return jobs
+
+
+def run(
+    count, difficulties, out, seed=0, workers=None, chunk_size=CHUNK_SIZE, index=None
+):
+    """Generate puzzles with a process pool, streaming lines to `out`.
+    With a canonical.DedupIndex as `index`, puzzles equivalent to one already
+    in it are dropped. Returns (puzzles written, duplicates, seconds elapsed)."""
+    jobs = plan_chunks(count, difficulties, chunk_size)
+    worker = generate_chunk if index is None else generate_keyed_chunk
+    written = duplicates = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(worker, seed, difficulty, chunk, size)
+            for difficulty, chunk, size in jobs
+        ]
+        for future in as_completed(futures):
+            lines = future.result()
+            if index is not None:
+                keyed = lines
+                lines = [line for line, key in keyed if index.add(key)]
+                duplicates += len(keyed) - len(lines)
+            out.writelines(lines)
+            out.flush()
+            written += len(lines)
+    return written, duplicates, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate Sudoku puzzles in bulk.")
+    parser.add_argument(
+        "-n", "--count", type=int, default=100, help="puzzles per difficulty"
+    )
+    parser.add_argument(
+        "-d",
+        "--difficulty",
+        nargs="+",
+        choices=list(DIFFICULTY_REMOVALS),
+        default=list(DIFFICULTY_REMOVALS),
+        help="difficulty levels to generate (default: all)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="base RNG seed")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes (default: all cores)",
+    )
+    parser.add_argument(
+        "--chunk", type=int, default=CHUNK_SIZE, help="puzzles per worker task"
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="output file (default: stdout)"
+    )
+    parser.add_argument(
+        "--dedup",
+        metavar="INDEX",
+        help="skip puzzles equivalent to one in this canonical.py index, "
+        "and add new ones",
+    )
+    args = parser.parse_args(argv)
+    if args.count < 1:
+        parser.error("-n/--count must be at least 1")
+    if args.chunk < 1:
+        parser.error("--chunk must be at least 1")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    index = None
+    if args.dedup:
+        from canonical import DedupIndex
+
+        index = DedupIndex(args.dedup)
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        written, duplicates, elapsed = run(
+            args.count, args.difficulty, out, args.seed, args.workers, args.chunk, index
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if index is not None:
+            index.close()
+
+    workers = args.workers or os.cpu_count()
+    print(
+        f"{written} puzzles in {elapsed:.2f}s with {workers} workers "
+        f"({written / elapsed:.0f} puzzles/sec)",
+        file=sys.stderr,
+    )
+    if index is not None:
+        print(f"{duplicates} duplicates skipped", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+"""
+Reproducible benchmarks for generation, solving, rendering and saving.
+
+    python3 benchmarks.py -o baseline.json
+    python3 benchmarks.py --baseline baseline.json --threshold 0.15
+    python3 benchmarks.py -k solve -k render --repeat 9
+    python3 benchmarks.py --hint-latency
+
+Every benchmark times one operation (generate a puzzle, solve a puzzle, draw
+a frame, ...) over several rounds and reports the best and median seconds
+per operation. Random inputs come from fixed seeds, and frames are drawn
+off-screen through SDL's dummy video driver. Results are written as JSON;
+with --baseline, each result is compared with the stored one and the exit
+status is 1 if any got slower by more than the threshold.
+
+--hint-latency instead steps through every hint of the reference puzzles and
+of generated hard ones, and the exit status is 1 if any Board.hint() call
+takes longer than HINT_LIMIT (best of --repeat runs).
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import dlx
+from generator import DIFFICULTY_REMOVALS, generate_puzzle
+from solver import BENCH_PUZZLES, format_puzzle, parse_puzzle, solve
+
+SEED = 2024
+BOXES = [(r, c) for r in range(3) for c in range(3)]
+REPEAT = 5
+THRESHOLD = 0.10  # allowed slowdown against the baseline (10%)
+HINT_LIMIT = 0.001  # longest a Board.hint() call may take, in seconds
+HINT_PUZZLES = 60  # generated hard puzzles stepped through by --hint-latency
+
+# Puzzles for the solver benchmarks. "brute" is built to defeat left-to-right
+# backtracking (its first row solves to 987654321).
+SOLVE_PUZZLES = dict(
+    BENCH_PUZZLES,
+    brute=(
+        "000000000000003085001020000"
+        "000507000004000100090000000"
+        "500000073002010000000040009"
+    ),
+)
+
+
+# --------------------------------------------------------------------------------
+# Benchmarks: each setup function prepares its inputs and returns a callable
+# that performs one operation.
+# --------------------------------------------------------------------------------
+def setup_generate(difficulty):
+    def setup():
+        rng = random.Random(f"{SEED}:{difficulty}")
+        return lambda: generate_puzzle(difficulty, rng)
+
+    return setup
+
+
+def setup_solve(name):
+    def setup():
+        puzzle = parse_puzzle(SOLVE_PUZZLES[name])
+        return lambda: solve(puzzle)
+
+    return setup
+
+
+def setup_dlx_generate(box):
+    def setup():
+        rng = random.Random(f"{SEED}:dlx:{box}")
+        return lambda: dlx.generate_puzzle(box, "medium", rng)
+
+    return setup
+
+
+def setup_dlx_remove(box):
+    """Blanking one fixed full grid with one seed, so every op does the same work."""
+
+    def setup():
+        solution = dlx.full_grid(box, random.Random(f"{SEED}:dlx:{box}"))
+        removals = round(len(solution) * dlx.DIFFICULTY_FRACTIONS["medium"])
+        return lambda: dlx.remove_numbers(solution, removals, random.Random(SEED))
+
+    return setup
+
+
+def setup_dlx_solve(box):
+    def setup():
+        puzzle, _ = dlx.generate_puzzle(
+            box, "medium", random.Random(f"{SEED}:dlx:{box}")
+        )
+        return lambda: dlx.solve(puzzle)
+
+    return setup
+
+
+def setup_canonical():
+    from canonical import canonical_form
+
+    puzzle, _ = generate_puzzle("hard", random.Random(SEED))
+    text = format_puzzle(puzzle)
+    return lambda: canonical_form(text)
+
+
+def _render_fixture():
+    """A window, a board partway through a game and the main module, headless."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # keep stdout JSON clean
+    import pygame
+
+    import main
+    from board import Board
+
+    main.init_pygame()
+    win = pygame.display.set_mode((main.WINDOW_WIDTH, main.WINDOW_HEIGHT))
+    puzzle, solution = generate_puzzle("medium", random.Random(SEED))
+    board = Board(puzzle, solution)
+    board.set_auto_notes(True)
+    board.selected = next(
+        (r, c) for r in range(9) for c in range(9) if not puzzle[r][c]
+    )
+    # Draw once so cached glyphs and layers are built before timing.
+    main.redraw_window(win, board, False, "", main.Timeline(), "00:00")
+    return main, win, board
+
+
+def setup_render_full():
+    main, win, board = _render_fixture()
+    return lambda: main.redraw_window(win, board, False, "", main.Timeline(), "00:00")
+
+
+def setup_render_move():
+    from render import RenderScheduler
+
+    main, win, board = _render_fixture()
+    scheduler = RenderScheduler()
+    scheduler.clear()
+    row, col = board.selected
+    digits = [board.solution[row][col], board.solution[row][col] % 9 + 1]
+    state = {"turn": 0}
+
+    def frame():
+        # Enter a digit, then redraw only what it changed (as the game loop does).
+        highlighted = board.highlighted_cells()
+        board.set_cell_value(row, col, digits[state["turn"] % 2])
+        state["turn"] += 1
+        scheduler.invalidate_cells(highlighted | board.highlighted_cells())
+        scheduler.invalidate_cells([(row, col)])
+        scheduler.invalidate_cells(board.peers(row, col))
+        main.redraw_dirty(win, board, False, "", main.Timeline(), "00:00", scheduler)
+
+    return frame
+
+
+def setup_render_burst():
+    """A dirty-region frame while every row, column, box and digit is animating."""
+    import animation
+    from render import RenderScheduler
+
+    main, win, board = _render_fixture()
+    scheduler = RenderScheduler()
+    scheduler.clear()
+    anims = [
+        animation.unit_animation_event(kind, index, 0)
+        for kind, indices in (("row", range(9)), ("col", range(9)), ("box", BOXES))
+        for index in indices
+    ]
+    for digit in range(1, 10):
+        anims += animation.number_animation_events(board, digit, 0)
+    for anim in anims:
+        anim.duration = 1 << 62  # keeps running for the whole benchmark
+    timeline = main.Timeline()
+    timeline.extend(anims)
+    return lambda: main.redraw_dirty(
+        win, board, False, "", timeline, "00:00", scheduler
+    )
+
+
+def _save_fixture():
+    """A board partway through a game and its save_game() arguments."""
+    from core import Board
+
+    puzzle, solution = generate_puzzle("medium", random.Random(SEED))
+    board = Board(puzzle, solution)
+    board.set_auto_notes(True)
+    current, notes, givens = board.get_state()
+    return board, (current, board.solution, givens, notes, "medium", 123, True)
+
+
+def setup_save_round_trip():
+    import save
+
+    _, args = _save_fixture()
+    # Removed once the benchmark drops the closure that holds it.
+    scratch = tempfile.TemporaryDirectory(prefix="sudoku-bench-")
+
+    def round_trip():
+        # save.py uses paths relative to the working directory
+        cwd = os.getcwd()
+        os.chdir(scratch.name)
+        try:
+            save.save_game(*args)
+            return save.load_game()
+        finally:
+            os.chdir(cwd)
+
+    return round_trip
+
+
+def setup_save_encode():
+    import save
+
+    _, args = _save_fixture()
+    data = save._game_data(*args)
+    return lambda: save.decode_save(save.encode_save(data))
+
+
+def setup_journal_move():
+    from journal import Journal
+
+    board, _ = _save_fixture()
+    journal = Journal(board)
+    cell = next(i for i in range(81) if not board.givens[i])
+    row, col = divmod(cell, 9)
+    digits = [board.solution[row][col], board.solution[row][col] % 9 + 1]
+    state = {"turn": 0}
+
+    def move():
+        journal.play(row, col, digits[state["turn"] % 2])
+        state["turn"] += 1
+        return journal.take_unsaved()
+
+    return move
+
+
+# (name, setup, operations per round)
+BENCHMARKS = (
+    *((f"generate/{d}", setup_generate(d), 20) for d in DIFFICULTY_REMOVALS),
+    *((f"solve/{name}", setup_solve(name), 20) for name in SOLVE_PUZZLES),
+    # Exact-cover engine scaling across grid sizes: (box, generate ops, solve ops)
+    *(
+        bench
+        for box, generate_ops, solve_ops in ((2, 200, 500), (3, 20, 100), (4, 3, 20))
+        for bench in (
+            (
+                f"dlx/generate/{box * box}x{box * box}",
+                setup_dlx_generate(box),
+                generate_ops,
+            ),
+            (f"dlx/solve/{box * box}x{box * box}", setup_dlx_solve(box), solve_ops),
+        )
+    ),
+    # Generation time at 25x25 swings with the random grid, so time the
+    # removal pass over one fixed grid instead.
+    ("dlx/remove/25x25", setup_dlx_remove(5), 3),
+    ("dlx/solve/25x25", setup_dlx_solve(5), 3),
+    ("canonical/form", setup_canonical, 500),
+    ("render/full_frame", setup_render_full, 50),
+    ("render/move_frame", setup_render_move, 200),
+    ("render/animation_burst", setup_render_burst, 50),
+    ("save/encode_decode", setup_save_encode, 500),
+    ("save/save_load_file", setup_save_round_trip, 20),
+    ("save/journal_move", setup_journal_move, 2000),
+)
+
+
+def time_benchmark(setup, number, repeat=REPEAT):
+    """Run one benchmark and return {"best", "median"} seconds per operation."""
+    op = setup()
+    op()  # warm up
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        rounds.append((time.perf_counter() - start) / number)
+    return {"best": min(rounds), "median": statistics.median(rounds), "ops": number}
+
+
+def run(names=None, repeat=REPEAT, log=sys.stderr):
+    """Run the benchmarks whose name contains any of `names` (all if None)."""
+    results = {}
+    for name, setup, number in BENCHMARKS:
+        if names and not any(part in name for part in names):
+            continue
+        result = results[name] = time_benchmark(setup, number, repeat)
+        print(f"{name:<24}{result['best'] * 1e6:>12.1f} us", file=log)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": SEED,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def hint_latencies(repeat=REPEAT, count=HINT_PUZZLES):
+    """
+    Play every hint of the reference puzzles and of `count` generated hard
+    ones, and return the best time of each hint() call over `repeat` runs.
+    Hints are deterministic, so every run makes the same calls.
+    """
+    from core import Board
+
+    rng = random.Random(f"{SEED}:hints")
+    games = [(p, solve(p)) for p in map(parse_puzzle, SOLVE_PUZZLES.values())]
+    games += [generate_puzzle("hard", rng) for _ in range(count)]
+    best = None
+    for _ in range(repeat):
+        times = []
+        for puzzle, solution in games:
+            board = Board(puzzle, solution)
+            while not board.is_solved():
+                start = time.perf_counter()
+                hint = board.hint()
+                times.append(time.perf_counter() - start)
+                board.set_cell_value(*hint.cell, hint.digit)
+        best = times if best is None else list(map(min, best, times))
+    return best
+
+
+def check_hint_latency(repeat=REPEAT, limit=HINT_LIMIT, log=sys.stderr):
+    """Print hint() latency percentiles. Returns the number of calls over `limit`."""
+    times = sorted(hint_latencies(repeat))
+    slow = sum(t > limit for t in times)
+    print(
+        f"{len(times)} hints: p50 {times[len(times) // 2] * 1e6:.1f} us, "
+        f"p99 {times[len(times) * 99 // 100] * 1e6:.1f} us, "
+        f"max {times[-1] * 1e6:.1f} us, {slow} over {limit * 1e6:.0f} us",
+        file=log,
+    )
+    return slow
+
+
+def compare(current, baseline, threshold=THRESHOLD, out=sys.stdout):
+    """
+    Print each benchmark's best time against the baseline. Returns the names
+    that got slower by more than `threshold` (a fraction).
+    """
+    regressions = []
+    print(f"{'benchmark':<24}{'baseline':>12}{'current':>12}{'change':>9}", file=out)
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:<24}{'-':>12}{result['best'] * 1e6:>10.1f}us", file=out)
+            continue
+        change = result["best"] / base["best"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<24}{base['best'] * 1e6:>10.1f}us{result['best'] * 1e6:>10.1f}us"
+            f"{change:>+9.1%}{flag}",
+            file=out,
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Sudoku benchmarks.")
+    parser.add_argument(
+        "-k",
+        dest="names",
+        action="append",
+        help="only run benchmarks whose name contains this (repeatable)",
+    )
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed rounds each")
+    parser.add_argument("-o", "--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help="allowed slowdown before a result counts as a regression (0.10 = 10%%)",
+    )
+    parser.add_argument(
+        "--hint-latency",
+        action="store_true",
+        help="check that every hint takes under HINT_LIMIT instead of benchmarking",
+    )
+    args = parser.parse_args(argv)
+
+    if args.hint_latency:
+        return 1 if check_hint_latency(args.repeat) else 0
+
+    results = run(args.names, args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    elif not args.baseline:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,11 @@
 import pygame
-import random
+
+# Puzzle logic lives in core; the names are re-exported here for existing callers.
+import core
+from core import valid, solve_board, generate_full_board, remove_numbers  # noqa: F401
+from fonts import LazyFont
+from solver import DIGITS_OF_MASK
+from render_cache import CACHE
 
 # Window / Board layout constants
 WINDOW_WIDTH = 800
@@ -25,74 +31,82 @@ COLOR_GIVEN = (30, 30, 30)
 COLOR_USER = (40, 80, 220)
 COLOR_INCORRECT = (255, 80, 80)
 
-pygame.font.init()
-FONT_CELL = pygame.font.SysFont("sans", 32, bold=True)
-FONT_NOTE = pygame.font.SysFont("sans", 16)
-
-
-# Puzzle Generation Functions
-def valid(board, row, col, num):
-    """Check if placing num at board[row][col] is valid with Sudoku rules."""
-    for i in range(9):
-        if board[row][i] == num or board[i][col] == num:
-            return False
-    box_x = (col // 3) * 3
-    box_y = (row // 3) * 3
-    for i in range(3):
-        for j in range(3):
-            if board[box_y + i][box_x + j] == num:
-                return False
-    return True
-
-
-def solve_board(board):
-    """Backtracking solver to fill board in-place with a valid solution."""
-    for row in range(9):
-        for col in range(9):
-            if board[row][col] == 0:
-                candidates = list(range(1, 10))
-                random.shuffle(candidates)
-                for num in candidates:
-                    if valid(board, row, col, num):
-                        board[row][col] = num
-                        if solve_board(board):
-                            return True
-                        board[row][col] = 0
-                return False
-    return True
-
-
-def generate_full_board():
-    """Generate a complete 9x9 Sudoku solution."""
-    board = [[0] * 9 for _ in range(9)]
-    solve_board(board)
-    return board
-
-
-def remove_numbers(board, removals=40):
-    """Create a puzzle by removing 'removals' cells from a full board."""
-    puzzle = [row[:] for row in board]
-    count = removals
-    while count > 0:
-        row = random.randint(0, 8)
-        col = random.randint(0, 8)
-        if puzzle[row][col] != 0:
-            puzzle[row][col] = 0
-            count -= 1
-    return puzzle
+# Created on first draw, not at import
+FONT_CELL = LazyFont("sans", 32, bold=True)
+FONT_NOTE = LazyFont("sans", 16)
+COLOR_NOTE = (80, 80, 80)
+
+DIGIT_TEXT = [str(d) for d in range(10)]
+
+# Notes are drawn in a 3x3 mini-grid, digit d always in the same spot:
+# NOTE_CENTERS[d] is its center relative to the cell's top-left corner.
+NOTE_SIZE = CELL_SIZE / 3
+NOTE_CENTERS = [None] + [
+    ((d % 3 + 0.5) * NOTE_SIZE, (d // 3 + 0.5) * NOTE_SIZE) for d in range(9)
+]
+
+
+# Static grid lines are pre-drawn onto a color-keyed layer covering the board
+# plus the 1px overhang of the thick outer lines.
+GRID_LAYER_POS = (BOARD_OFFSET_X - 2, BOARD_OFFSET_Y - 2)
+GRID_LAYER_KEY = (255, 0, 255)
+
+
+def theme():
+    """Colors the cached surfaces depend on; a change drops the render cache."""
+    return (
+        COLOR_BG,
+        COLOR_HEADER,
+        COLOR_HEADER_TEXT,
+        COLOR_CELL_BG,
+        COLOR_CELL_LINES,
+        COLOR_GIVEN,
+        COLOR_USER,
+        COLOR_INCORRECT,
+        COLOR_NOTE,
+    )
+
+
+def draw_grid_lines(win, offset_x=BOARD_OFFSET_X, offset_y=BOARD_OFFSET_Y):
+    """Draw the thin cell lines and thick 3x3 box lines."""
+    for i in range(10):
+        line_width = 3 if i % 3 == 0 else 1
+
+        # Horizontal grid lines
+        start_x = offset_x
+        start_y = offset_y + i * CELL_SIZE
+        end_x = offset_x + BOARD_SIZE
+        pygame.draw.line(
+            win, COLOR_CELL_LINES, (start_x, start_y), (end_x, start_y), line_width
+        )
+
+        # Vertical grid lines
+        start_x = offset_x + i * CELL_SIZE
+        start_y = offset_y
+        end_y = offset_y + BOARD_SIZE
+        pygame.draw.line(
+            win, COLOR_CELL_LINES, (start_x, start_y), (start_x, end_y), line_width
+        )
+
+
+def _build_grid_layer():
+    layer = pygame.Surface((BOARD_SIZE + 4, BOARD_SIZE + 4))
+    layer.fill(GRID_LAYER_KEY)
+    layer.set_colorkey(GRID_LAYER_KEY)
+    draw_grid_lines(layer, 2, 2)
+    return layer
+
+
+def grid_layer():
+    """The cached grid-line layer, drawn at GRID_LAYER_POS."""
+    return CACHE.layer("grid", _build_grid_layer)
 
 
 # --------------------------------------------------------------------------------
-# Cell and Board Classes
+# Cell and Board Views
 # --------------------------------------------------------------------------------
-class Cell:
-    def __init__(self, value, row, col, given):
-        self.value = value
-        self.row = row
-        self.col = col
-        self.given = given
-        self.notes = []
-        self.incorrect = False
+class Cell(core.Cell):
+    __slots__ = ()
 
     def draw(self, win):
         """Draw the cell (value or notes)."""
@@ -100,14 +114,14 @@ class Cell:
         y = BOARD_OFFSET_Y + self.row * CELL_SIZE
 
         # Fill background
-        pygame.draw.rect(win, COLOR_CELL_BG, (x, y, CELL_SIZE, CELL_SIZE))
+        win.fill(COLOR_CELL_BG, (x, y, CELL_SIZE, CELL_SIZE))
 
         # If there's a value, draw it
         if self.value != 0:
             text_color = COLOR_GIVEN if self.given else COLOR_USER
             if self.incorrect:
                 text_color = COLOR_INCORRECT
-            val_surf = FONT_CELL.render(str(self.value), True, text_color)
+            val_surf = CACHE.text(FONT_CELL, str(self.value), text_color)
             win.blit(
                 val_surf,
                 (
@@ -115,112 +129,80 @@ class Cell:
                     y + (CELL_SIZE - val_surf.get_height()) // 2,
                 ),
             )
-        # Otherwise, draw candidate notes
-        elif self.notes:
-            sorted_notes = sorted(self.notes)
-            sub_size = CELL_SIZE / 2
-            for i, note in enumerate(sorted_notes):
-                sub_x = x + (i % 2) * sub_size
-                sub_y = y + (i // 2) * sub_size
-                note_surf = FONT_NOTE.render(str(note), True, (80, 80, 80))
-                note_x = sub_x + (sub_size - note_surf.get_width()) / 2
-                note_y = sub_y + (sub_size - note_surf.get_height()) / 2
+        # Otherwise, draw candidate notes straight from the note mask
+        else:
+            for note in DIGITS_OF_MASK[self.board.notes[self.index]]:
+                note_surf = CACHE.text(FONT_NOTE, DIGIT_TEXT[note], COLOR_NOTE)
+                center_x, center_y = NOTE_CENTERS[note]
+                note_x = x + center_x - note_surf.get_width() / 2
+                note_y = y + center_y - note_surf.get_height() / 2
                 win.blit(note_surf, (note_x, note_y))
 
 
-class Board:
-    def __init__(self, puzzle, solution):
-        """
-        puzzle: 9x9 with some zeros (the puzzle).
-        solution: the fully solved board.
-        """
-        self.cells = [[None] * 9 for _ in range(9)]
-        for i in range(9):
-            for j in range(9):
-                given = puzzle[i][j] != 0
-                self.cells[i][j] = Cell(puzzle[i][j], i, j, given)
-        self.solution = solution
-        self.selected = None
+class Board(core.Board):
+    """The core Board model plus pygame drawing and mouse handling."""
+
+    __slots__ = ()
+    cell_class = Cell
 
     def draw(self, win):
         """Draw the board including semi-transparent highlights for the selected cell,
         its row, column, and all same-value cells."""
-        # Draw every cell normally first
-        for row in self.cells:
-            for cell in row:
-                cell.draw(win)
-
-        # If a cell is selected, apply overlays
-        if self.selected:
-            sel_row, sel_col = self.selected
-
-            # Create semi-transparent overlay surfaces.
-            # Adjust the alpha value (fourth value in RGBA) as needed.
-            highlight_overlay = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
-            highlight_overlay.fill(
-                (210, 230, 255, 100)
-            )  # Light blue for row & column (alpha=100)
-
-            selected_overlay = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
-            selected_overlay.fill(
-                (100, 190, 255, 150)
-            )  # Stronger blue for the selected cell (alpha=150)
-
-            # Draw the row highlight.
-            for col in range(9):
-                hx = BOARD_OFFSET_X + col * CELL_SIZE
-                hy = BOARD_OFFSET_Y + sel_row * CELL_SIZE
-                win.blit(highlight_overlay, (hx, hy))
-
-            # Draw the column highlight.
-            for row in range(9):
-                hx = BOARD_OFFSET_X + sel_col * CELL_SIZE
-                hy = BOARD_OFFSET_Y + row * CELL_SIZE
-                win.blit(highlight_overlay, (hx, hy))
-
-            # Draw the overlay for the selected cell.
-            sx = BOARD_OFFSET_X + sel_col * CELL_SIZE
-            sy = BOARD_OFFSET_Y + sel_row * CELL_SIZE
-            win.blit(selected_overlay, (sx, sy))
-
-            # Highlight other cells that share the same value as the selected cell.
-            selected_value = self.cells[sel_row][sel_col].value
-            if selected_value != 0:
-                same_val_overlay = pygame.Surface(
-                    (CELL_SIZE, CELL_SIZE), pygame.SRCALPHA
-                )
-                same_val_overlay.fill(
-                    (255, 235, 130, 100)
-                )  # Semi-transparent yellowish overlay (alpha=100)
-                for r in range(9):
-                    for c in range(9):
-                        if (r, c) != (sel_row, sel_col) and self.cells[r][
-                            c
-                        ].value == selected_value:
-                            overlay_x = BOARD_OFFSET_X + c * CELL_SIZE
-                            overlay_y = BOARD_OFFSET_Y + r * CELL_SIZE
-                            win.blit(same_val_overlay, (overlay_x, overlay_y))
+        CACHE.validate(win.get_size(), theme())
+        self._draw_cell_contents(win, [(r, c) for r in range(9) for c in range(9)])
 
         # Draw grid lines on top so board structure remains clear.
-        for i in range(10):
-            line_width = 3 if i % 3 == 0 else 1
-
-            # Horizontal grid lines
-            start_x = BOARD_OFFSET_X
-            start_y = BOARD_OFFSET_Y + i * CELL_SIZE
-            end_x = BOARD_OFFSET_X + BOARD_SIZE
-            pygame.draw.line(
-                win, COLOR_CELL_LINES, (start_x, start_y), (end_x, start_y), line_width
-            )
+        win.blit(grid_layer(), GRID_LAYER_POS)
 
-            # Vertical grid lines
-            start_x = BOARD_OFFSET_X + i * CELL_SIZE
-            start_y = BOARD_OFFSET_Y
-            end_y = BOARD_OFFSET_Y + BOARD_SIZE
-            pygame.draw.line(
-                win, COLOR_CELL_LINES, (start_x, start_y), (start_x, end_y), line_width
+    def draw_cells(self, win, cells):
+        """Redraw only the given (row, col) cells, including their highlight
+        overlays and the grid lines along their edges. Produces the same pixels
+        as a full draw() within those cells."""
+        if not cells:
+            return
+        CACHE.validate(win.get_size(), theme())
+        self._draw_cell_contents(win, cells)
+        layer = grid_layer()
+        for r, c in cells:
+            rect = self.cell_rect(r, c)
+            win.blit(
+                layer, rect.topleft, rect.move(-GRID_LAYER_POS[0], -GRID_LAYER_POS[1])
             )
 
+    def _draw_cell_contents(self, win, cells):
+        """Draw the given cells with their row/column, selection and same-value
+        overlays."""
+        # Semi-transparent overlays come from the cache, so they are allocated once.
+        size = (CELL_SIZE, CELL_SIZE)
+        highlight_overlay = CACHE.overlay(size, (210, 230, 255, 100))
+        selected_overlay = CACHE.overlay(size, (100, 190, 255, 150))
+        same_val_overlay = CACHE.overlay(size, (255, 235, 130, 100))
+
+        sel_row, sel_col = self.selected if self.selected else (-1, -1)
+        selected_value = self.cells[sel_row][sel_col].value if self.selected else 0
+        for r, c in cells:
+            cell = self.cells[r][c]
+            cell.draw(win)
+            pos = (BOARD_OFFSET_X + c * CELL_SIZE, BOARD_OFFSET_Y + r * CELL_SIZE)
+            # Row and column highlights overlap (and stack) on the selected cell.
+            if r == sel_row:
+                win.blit(highlight_overlay, pos)
+            if c == sel_col:
+                win.blit(highlight_overlay, pos)
+            if (r, c) == (sel_row, sel_col):
+                win.blit(selected_overlay, pos)
+            elif selected_value != 0 and cell.value == selected_value:
+                win.blit(same_val_overlay, pos)
+
+    def cell_rect(self, row, col):
+        """Screen rectangle covered by a cell."""
+        return pygame.Rect(
+            BOARD_OFFSET_X + col * CELL_SIZE,
+            BOARD_OFFSET_Y + row * CELL_SIZE,
+            CELL_SIZE,
+            CELL_SIZE,
+        )
+
     def click(self, pos):
         """Set self.selected if the click is on the board."""
         x, y = pos
@@ -233,63 +215,3 @@ class Board:
             self.selected = (row, col)
             return (row, col)
         return None
-
-    def set_cell_value(self, row, col, value, note_mode=False):
-        """Set a cell's value or toggle notes. Mark incorrect if it doesn't match solution."""
-        cell = self.cells[row][col]
-        if cell.given:
-            return
-        if note_mode:
-            if value in cell.notes:
-                cell.notes.remove(value)
-            elif len(cell.notes) < 4:
-                cell.notes.append(value)
-        else:
-            cell.value = value
-            cell.notes = []
-            cell.incorrect = self.solution[row][col] != value
-
-    def is_solved(self):
-        """Check if all cells match the solution."""
-        for i in range(9):
-            for j in range(9):
-                cell = self.cells[i][j]
-                if cell.value == 0 or cell.value != self.solution[i][j]:
-                    return False
-        return True
-
-    def get_state(self):
-        """Return the puzzle data for saving."""
-        current = [[cell.value for cell in row] for row in self.cells]
-        notes = [[cell.notes for cell in row] for row in self.cells]
-        givens = [[1 if cell.given else 0 for cell in row] for row in self.cells]
-        return current, notes, givens
-
-    def is_number_complete(self, num):
-        """Return True if every cell that should contain num (per the solution) has num filled in."""
-        return all(
-            self.cells[i][j].value == num
-            for i in range(9)
-            for j in range(9)
-            if self.solution[i][j] == num
-        )
-
-    @classmethod
-    def from_save(cls, data):
-        """Reconstruct a Board from saved JSON data."""
-        current = data["current"]
-        solution = data["solution"]
-        givens_data = data["givens"]
-        notes_data = data["notes"]
-
-        instance = cls.__new__(cls)
-        instance.cells = [[None] * 9 for _ in range(9)]
-        for i in range(9):
-            for j in range(9):
-                given = givens_data[i][j] == 1
-                c = Cell(current[i][j], i, j, given)
-                c.notes = notes_data[i][j] if notes_data[i][j] else []
-                instance.cells[i][j] = c
-        instance.solution = solution
-        instance.selected = None
-        return instance
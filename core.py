@@ -0,0 +1,494 @@
+import random
+from array import array
+
+from solver import (
+    ALL_DIGITS,
+    BOX_OF,
+    COL_OF,
+    DIGITS_OF_MASK,
+    PEERS,
+    POPCOUNT,
+    ROW_OF,
+    flatten,
+    solve_in_place,
+    unflatten,
+)
+from generator import remove_numbers as remove_unique
+from grader import Hint, hint_search
+
+# Pure puzzle model and engines. Nothing here imports pygame, so batch tools
+# and services can use it without SDL; board.py layers the pygame view on top.
+
+
+# Puzzle Generation Functions
+def valid(board, row, col, num):
+    """Check if placing num at board[row][col] is valid with Sudoku rules."""
+    for i in range(9):
+        if board[row][i] == num or board[i][col] == num:
+            return False
+    box_x = (col // 3) * 3
+    box_y = (row // 3) * 3
+    for i in range(3):
+        for j in range(3):
+            if board[box_y + i][box_x + j] == num:
+                return False
+    return True
+
+
+def solve_board(board):
+    """Fill board in-place with a valid solution using the bitmask solver.
+    Candidates are tried in random order so repeated calls give varied grids."""
+    return solve_in_place(board, random)
+
+
+def generate_full_board():
+    """Generate a complete 9x9 Sudoku solution."""
+    board = [[0] * 9 for _ in range(9)]
+    solve_board(board)
+    return board
+
+
+def remove_numbers(board, removals=40):
+    """Create a puzzle with a unique solution by removing up to 'removals' cells
+    from a full board."""
+    return remove_unique(board, removals, random)
+
+
+# --------------------------------------------------------------------------------
+# Cell and Board Model
+#
+# A Board keeps all of its state in one bytearray, split into flat regions:
+# per-cell values, given flags, incorrect flags, 9-bit note masks and the
+# hint candidate masks (both uint16, bit d-1 for digit d), then the digits
+# placed correctly per row, column and box (uint16) and the correct-cell
+# counters per row, column, box and digit plus the total. Copies and
+# snapshots are a single buffer copy, and a board costs about 1.7 KB, so
+# many can be held at once. Cell objects are only views onto that buffer
+# and are created the first time `cells` is used.
+# --------------------------------------------------------------------------------
+VALUES_AT = 0
+GIVENS_AT = 81
+INCORRECT_AT = 162
+NOTES_AT = 244  # kept even so the uint16 regions line up
+CANDIDATES_AT = NOTES_AT + 2 * 81
+UNIT_DIGITS_AT = CANDIDATES_AT + 2 * 81  # rows, then columns, then boxes
+COUNTS_AT = UNIT_DIGITS_AT + 2 * 27  # rows, columns, boxes, digits 0-9, total
+TOTAL_AT = COUNTS_AT + 37
+STATE_SIZE = TOTAL_AT + 1
+
+# Elimination passes one hint() call may run. Each pass takes at most about
+# 0.25 ms, so a call stays under 1 ms; longer searches resume on the next call.
+HINT_PASSES = 3
+
+# Offsets into the buffer viewed as uint16
+_NOTES_W = NOTES_AT // 2
+_CANDIDATES_W = CANDIDATES_AT // 2
+_ROW_DIGITS_W = UNIT_DIGITS_AT // 2
+_COL_DIGITS_W = _ROW_DIGITS_W + 9
+_BOX_DIGITS_W = _COL_DIGITS_W + 9
+_ROW_COUNT = COUNTS_AT
+_COL_COUNT = COUNTS_AT + 9
+_BOX_COUNT = COUNTS_AT + 18
+_DIGIT_COUNT = COUNTS_AT + 27
+
+
+class Cell:
+    """View of one square of a Board; reads and writes go to the board's buffers."""
+
+    __slots__ = ("board", "index", "row", "col")
+
+    def __init__(self, board, index):
+        self.board = board
+        self.index = index
+        self.row, self.col = divmod(index, 9)
+
+    @property
+    def value(self):
+        return self.board.values[self.index]
+
+    @value.setter
+    def value(self, value):
+        self.board.values[self.index] = value
+
+    @property
+    def given(self):
+        return self.board._buf[GIVENS_AT + self.index] == 1
+
+    @given.setter
+    def given(self, given):
+        self.board._buf[GIVENS_AT + self.index] = 1 if given else 0
+
+    @property
+    def incorrect(self):
+        return self.board._buf[INCORRECT_AT + self.index] == 1
+
+    @incorrect.setter
+    def incorrect(self, incorrect):
+        self.board._buf[INCORRECT_AT + self.index] = 1 if incorrect else 0
+
+    @property
+    def notes(self):
+        """The cell's notes as a sorted list of digits (a copy)."""
+        return list(DIGITS_OF_MASK[self.board.notes[self.index]])
+
+    @notes.setter
+    def notes(self, notes):
+        mask = 0
+        for note in notes:
+            mask |= 1 << (note - 1)
+        self.board.notes[self.index] = mask
+
+
+class Board:
+    __slots__ = (
+        "_buf",
+        "_words",
+        "values",
+        "notes",
+        "_solution",
+        "_solution_rows",
+        "_cells",
+        "selected",
+        "completions",
+        "_hint",
+        "_search",
+        "auto_notes",
+    )
+
+    # Subclasses (e.g. the pygame view) can swap in their own cell type.
+    cell_class = Cell
+
+    def __init__(self, puzzle, solution):
+        """
+        puzzle: 9x9 with some zeros (the puzzle).
+        solution: the fully solved board.
+        """
+        self._attach(bytearray(STATE_SIZE), bytes(flatten(solution)))
+        buf = self._buf
+        for i, v in enumerate(flatten(puzzle)):
+            if v:
+                buf[VALUES_AT + i] = v
+                buf[GIVENS_AT + i] = 1
+        self._init_tracking()
+
+    def _attach(self, buf, solution, solution_rows=None):
+        """Point the views at a state buffer. Copies share the solution objects."""
+        self._buf = buf
+        self._words = memoryview(buf).cast("H")
+        self.values = self._words.cast("B")[VALUES_AT:GIVENS_AT]
+        self.notes = self._words[_NOTES_W:_CANDIDATES_W]
+        self._solution = solution
+        self._solution_rows = solution_rows
+        self._cells = None
+        self.selected = None
+        self.completions = []
+        self._hint = None
+        self._search = None
+        self.auto_notes = False
+
+    @property
+    def solution(self):
+        """The solution as a 9x9 tuple of row tuples, built on first use."""
+        if self._solution_rows is None:
+            s = self._solution
+            self._solution_rows = tuple(tuple(s[r * 9 : r * 9 + 9]) for r in range(9))
+        return self._solution_rows
+
+    @property
+    def givens(self):
+        """Per-cell given flags (1 or 0), as a view onto the state buffer."""
+        return memoryview(self._buf)[GIVENS_AT:INCORRECT_AT]
+
+    @property
+    def incorrect(self):
+        """Per-cell incorrect flags (1 or 0), as a view onto the state buffer."""
+        return memoryview(self._buf)[INCORRECT_AT : INCORRECT_AT + 81]
+
+    @property
+    def candidates(self):
+        """Hint candidate masks per cell (0 for correctly placed cells)."""
+        return self._words[_CANDIDATES_W : _CANDIDATES_W + 81]
+
+    @property
+    def correct_total(self):
+        """How many cells hold their solution digit."""
+        return self._buf[TOTAL_AT]
+
+    @property
+    def cells(self):
+        """9x9 grid of Cell views, built on first use."""
+        if self._cells is None:
+            cls = self.cell_class
+            self._cells = [[cls(self, r * 9 + c) for c in range(9)] for r in range(9)]
+        return self._cells
+
+    def copy(self):
+        """An independent copy of this board (one buffer copy)."""
+        other = type(self).__new__(type(self))
+        other._attach(bytearray(self._buf), self._solution, self._solution_rows)
+        other.selected = self.selected
+        other.auto_notes = self.auto_notes
+        other._hint = self._hint
+        return other
+
+    def snapshot(self):
+        """The board's state as immutable bytes."""
+        return bytes(self._buf)
+
+    def restore(self, snapshot):
+        """Reset the state to a snapshot() taken from a board with the same solution."""
+        self._buf[:] = snapshot
+        self.completions = []
+        self._hint = None
+        self._search = None
+
+    def _init_tracking(self):
+        """
+        Count correctly filled cells per row, column, box and digit so completion
+        checks are O(1), and set up the hint candidates. Units that are already
+        complete are queued as completion events straight away.
+        """
+        self._buf[COUNTS_AT:STATE_SIZE] = bytes(STATE_SIZE - COUNTS_AT)
+        self.completions = []
+        values = self.values
+        solution = self._solution
+        for i in range(81):
+            if values[i] == solution[i]:
+                self._count_correct(i // 9, i % 9, 1)
+        self._init_candidates()
+
+    def _init_candidates(self):
+        """
+        Digits placed correctly per row, column and box, and the candidate mask
+        of every cell they leave open (0 for placed cells). Wrong entries are
+        treated as empty, so hints never build on a mistake. set_cell_value
+        keeps these up to date, so hints start from ready-made candidates.
+        """
+        self._hint = None
+        self._search = None
+        words = self._words
+        values = self.values
+        solution = self._solution
+        self._buf[UNIT_DIGITS_AT:COUNTS_AT] = bytes(COUNTS_AT - UNIT_DIGITS_AT)
+        for i in range(81):
+            if values[i] == solution[i]:
+                bit = 1 << (values[i] - 1)
+                words[_ROW_DIGITS_W + ROW_OF[i]] |= bit
+                words[_COL_DIGITS_W + COL_OF[i]] |= bit
+                words[_BOX_DIGITS_W + BOX_OF[i]] |= bit
+        for i in range(81):
+            words[_CANDIDATES_W + i] = self._open_digits(i)
+
+    def _open_digits(self, i):
+        if self.values[i] == self._solution[i]:
+            return 0
+        words = self._words
+        used = words[_ROW_DIGITS_W + ROW_OF[i]] | words[_COL_DIGITS_W + COL_OF[i]]
+        return ~(used | words[_BOX_DIGITS_W + BOX_OF[i]]) & ALL_DIGITS
+
+    def _update_candidates(self, i, placed):
+        """Add or remove the solution digit of cell i as a placed digit."""
+        words = self._words
+        bit = 1 << (self._solution[i] - 1)
+        if placed:
+            words[_ROW_DIGITS_W + ROW_OF[i]] |= bit
+            words[_COL_DIGITS_W + COL_OF[i]] |= bit
+            words[_BOX_DIGITS_W + BOX_OF[i]] |= bit
+            words[_CANDIDATES_W + i] = 0
+            keep = ~bit & ALL_DIGITS
+            for p in PEERS[i]:
+                words[_CANDIDATES_W + p] &= keep
+        else:
+            keep = ~bit & ALL_DIGITS
+            words[_ROW_DIGITS_W + ROW_OF[i]] &= keep
+            words[_COL_DIGITS_W + COL_OF[i]] &= keep
+            words[_BOX_DIGITS_W + BOX_OF[i]] &= keep
+            words[_CANDIDATES_W + i] = self._open_digits(i)
+            for p in PEERS[i]:
+                words[_CANDIDATES_W + p] = self._open_digits(p)
+
+    def _count_correct(self, row, col, delta):
+        """Adjust the counters for one cell and queue any unit that just completed."""
+        buf = self._buf
+        box = (row // 3) * 3 + col // 3
+        digit = self._solution[row * 9 + col]
+        buf[_ROW_COUNT + row] += delta
+        buf[_COL_COUNT + col] += delta
+        buf[_BOX_COUNT + box] += delta
+        buf[_DIGIT_COUNT + digit] += delta
+        buf[TOTAL_AT] += delta
+        if delta > 0:
+            if buf[_ROW_COUNT + row] == 9:
+                self.completions.append(("row", row))
+            if buf[_COL_COUNT + col] == 9:
+                self.completions.append(("col", col))
+            if buf[_BOX_COUNT + box] == 9:
+                self.completions.append(("box", (row // 3, col // 3)))
+            if buf[_DIGIT_COUNT + digit] == 9:
+                self.completions.append(("number", digit))
+
+    def pop_completions(self):
+        """Return and clear the (kind, index) completion events queued so far.
+        kind is "row", "col", "box" (index is (box_row, box_col)) or "number"."""
+        events = self.completions
+        self.completions = []
+        return events
+
+    def highlighted_cells(self):
+        """Return the set of (row, col) cells that currently carry a highlight
+        overlay."""
+        if not self.selected:
+            return set()
+        sel_row, sel_col = self.selected
+        cells = {(sel_row, c) for c in range(9)} | {(r, sel_col) for r in range(9)}
+        selected_value = self.values[sel_row * 9 + sel_col]
+        if selected_value != 0:
+            cells.update(
+                divmod(i, 9) for i in range(81) if self.values[i] == selected_value
+            )
+        return cells
+
+    def peers(self, row, col):
+        """The (row, col) cells sharing a row, column or box with a cell."""
+        return [divmod(p, 9) for p in PEERS[row * 9 + col]]
+
+    def _open_notes(self, i):
+        """Digits not yet entered in any peer of cell i, as a note mask."""
+        values = self.values
+        seen = 0
+        for p in PEERS[i]:
+            if values[p]:
+                seen |= 1 << (values[p] - 1)
+        return ~seen & ALL_DIGITS
+
+    def set_auto_notes(self, enabled):
+        """
+        Turn auto-notes on or off. Turning it on fills every empty cell's notes
+        with the digits none of its peers hold; while it is on, entering a
+        digit removes it from the peers' notes and clearing or replacing one
+        puts it back where no other peer holds it. Turning it off leaves the
+        notes as they are.
+        """
+        self.auto_notes = enabled
+        if enabled:
+            for i in range(81):
+                self.notes[i] = 0 if self.values[i] else self._open_notes(i)
+
+    def _update_auto_notes(self, i, old, value):
+        """Adjust the notes of cell i's empty peers after its value changed."""
+        values = self.values
+        notes = self.notes
+        if old:
+            bit = 1 << (old - 1)
+            for p in PEERS[i]:
+                if not values[p] and self._open_notes(p) & bit:
+                    notes[p] |= bit
+        if value:
+            keep = ~(1 << (value - 1)) & ALL_DIGITS
+            for p in PEERS[i]:
+                notes[p] &= keep
+
+    def set_cell_value(self, row, col, value, note_mode=False):
+        """Set a cell's value or toggle a note. Mark incorrect if it doesn't match
+        solution. With auto-notes on, only the peers' notes are updated."""
+        i = row * 9 + col
+        buf = self._buf
+        if buf[GIVENS_AT + i]:
+            return
+        if note_mode:
+            self.notes[i] ^= 1 << (value - 1)
+        else:
+            target = self._solution[i]
+            old = buf[VALUES_AT + i]
+            was_correct = old == target
+            buf[VALUES_AT + i] = value
+            self.notes[i] = 0
+            buf[INCORRECT_AT + i] = 1 if value and target != value else 0
+            if self.auto_notes:
+                if old != value:
+                    self._update_auto_notes(i, old, value)
+                if not value:
+                    self.notes[i] = self._open_notes(i)
+            if was_correct != (target == value):
+                self._count_correct(row, col, -1 if was_correct else 1)
+                self._update_candidates(i, not was_correct)
+                self._hint = None
+                self._search = None
+
+    def hint(self):
+        """
+        The next logical step as a Hint(cell, digit, technique), with cell as
+        (row, col). When the grader's techniques run out, the solution digit of
+        the open cell with the fewest candidates is given, with technique
+        "solution". Returns None once the board is solved.
+
+        Eliminations made while searching are kept in `candidates`: every
+        placed digit is correct, so they stay true after later moves and the
+        next hint continues from them instead of redoing the work. A call runs
+        at most HINT_PASSES elimination passes; if the search is not done by
+        then, the "solution" hint is returned for now and the next call picks
+        the search up where it stopped. The result is cached until a cell's
+        correctness changes.
+        """
+        if self.correct_total == 81:
+            return None
+        if self._hint is None:
+            cands = self.candidates
+            if self._search is None:
+                grid = [v if v == s else 0 for v, s in zip(self.values, self._solution)]
+                self._search = hint_search(grid, cands)
+            found = None
+            for passes, found in enumerate(self._search, 1):
+                if found is not None or passes == HINT_PASSES:
+                    break
+            else:
+                self._search = None
+            if found is None:
+                # Open cells are exactly those with candidates left.
+                i = min(
+                    (i for i in range(81) if cands[i]), key=lambda i: POPCOUNT[cands[i]]
+                )
+                found = Hint(i, self._solution[i], "solution")
+                if self._search is not None:
+                    return found._replace(cell=divmod(i, 9))
+            self._search = None
+            self._hint = found._replace(cell=divmod(found.cell, 9))
+        return self._hint
+
+    def is_solved(self):
+        """Check if all cells match the solution."""
+        return self.correct_total == 81
+
+    def get_state(self):
+        """Return the puzzle data for saving."""
+        current = unflatten(self.values)
+        notes = unflatten([list(DIGITS_OF_MASK[m]) for m in self.notes])
+        givens = unflatten(self.givens)
+        return current, notes, givens
+
+    def is_number_complete(self, num):
+        """Return True if every cell that should contain num (per the solution) has
+        num filled in."""
+        return self._buf[_DIGIT_COUNT + num] == 9
+
+    @classmethod
+    def from_save(cls, data):
+        """Reconstruct a Board from saved game data (as returned by save.load_game)."""
+        instance = cls.__new__(cls)
+        instance._attach(bytearray(STATE_SIZE), bytes(flatten(data["solution"])))
+        buf = instance._buf
+        current = flatten(data["current"])
+        givens = flatten(data["givens"])
+        notes = flatten(data["notes"])
+        for i in range(81):
+            buf[VALUES_AT + i] = current[i]
+            buf[GIVENS_AT + i] = 1 if givens[i] == 1 else 0
+            if current[i] and current[i] != instance._solution[i]:
+                buf[INCORRECT_AT + i] = 1
+            mask = 0
+            for note in notes[i] or ():
+                mask |= 1 << (note - 1)
+            instance.notes[i] = mask
+        instance.auto_notes = bool(data.get("auto_notes"))
+        instance._init_tracking()
+        return instance
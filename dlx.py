@@ -0,0 +1,484 @@
+"""
+Exact-cover (Dancing Links) solver and generator for N^2 x N^2 grids.
+
+    python3 dlx.py              # scaling table for 4x4, 9x9, 16x16 and 25x25
+    python3 dlx.py 16 --seed 3  # one size only
+
+A grid with boxes of `box` x `box` cells has side = box * box and is handled
+as a flat list of side * side ints (0 = empty, digits 1..side). Filling it is
+an exact-cover problem with 4 * side^2 constraint columns (each cell has one
+digit, and each row, column and box has each digit once) and side^3
+candidate rows. Knuth's Algorithm X runs over a dancing-links matrix kept in
+flat int lists, so the same matrix is reused for every search at one size
+and covering or uncovering a column only relinks list entries.
+
+Generation blanks cells in random order and keeps a blank only if the
+puzzle stays unique. Each uniqueness check has a node budget; a check that
+runs out keeps its clue, because a few of them would otherwise take seconds.
+A medium 25x25 puzzle takes 0.25-0.5 s and a hard one 4-6 s. A hard one
+also stops short of its blank count once no further cell can go.
+
+The 9x9 game keeps using solver.py, whose bitmask search is faster at that
+size. This engine is for larger grids, where plain backtracking bogs down.
+"""
+
+import argparse
+import random
+import time
+
+from generator import DIFFICULTY_REMOVALS
+
+# Digits above 9 are written as letters, so 16x16 grids use 1-9 and A-G and
+# 25x25 grids 1-9 and A-P. '0' or '.' marks an empty cell.
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"
+MAX_BOX = 5
+
+# Share of cells blanked for each difficulty, as generator.py blanks of 81.
+DIFFICULTY_FRACTIONS = {d: n / 81 for d, n in DIFFICULTY_REMOVALS.items()}
+
+# Rows a uniqueness check may try before giving up and keeping the clue.
+# Most checks need well under a hundred; the rare ones that run away would
+# otherwise take seconds each on 25x25 grids.
+UNIQUENESS_BUDGET = 512
+
+
+class DancingLinks:
+    """
+    Dancing-links matrix for the grids of one box size.
+
+    Node 0 is the root, nodes 1..4*side^2 are column headers, and every
+    candidate row (cell, digit) has four nodes, one per constraint it covers.
+    L/R/U/D are the circular links, C the column of each node, S the number
+    of rows left in each column and ROW the candidate (cell * side + digit - 1)
+    of each node.
+    """
+
+    __slots__ = ("box", "side", "L", "R", "U", "D", "C", "S", "ROW", "first")
+
+    def __init__(self, box):
+        side = box * box
+        cells = side * side
+        columns = 4 * cells
+        self.box = box
+        self.side = side
+        L = self.L = [i - 1 for i in range(columns + 1)]
+        R = self.R = [i + 1 for i in range(columns + 1)]
+        L[0] = columns
+        R[columns] = 0
+        U = self.U = list(range(columns + 1))
+        D = self.D = list(range(columns + 1))
+        C = self.C = list(range(columns + 1))
+        S = self.S = [0] * (columns + 1)
+        ROW = self.ROW = [-1] * (columns + 1)
+        self.first = []  # first node of each candidate row
+        for cell in range(cells):
+            r, c = divmod(cell, side)
+            b = r // box * box + c // box
+            for d in range(side):
+                first = len(C)
+                self.first.append(first)
+                heads = (
+                    1 + cell,
+                    1 + cells + r * side + d,
+                    1 + 2 * cells + c * side + d,
+                    1 + 3 * cells + b * side + d,
+                )
+                for k, col in enumerate(heads):
+                    node = first + k
+                    C.append(col)
+                    ROW.append(cell * side + d)
+                    U.append(U[col])
+                    D.append(col)
+                    D[U[col]] = node
+                    U[col] = node
+                    S[col] += 1
+                    L.append(node - 1 if k else first + 3)
+                    R.append(node + 1 if k < 3 else first)
+
+    def select(self, cell, digit):
+        """Fix a given: cover every column of its row. Undo with deselect()."""
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        node = self.first[cell * self.side + digit - 1]
+        for n in (node, node + 1, node + 2, node + 3):
+            c = C[n]
+            L[R[c]] = L[c]
+            R[L[c]] = R[c]
+            i = D[c]
+            while i != c:
+                j = R[i]
+                while j != i:
+                    U[D[j]] = U[j]
+                    D[U[j]] = D[j]
+                    S[C[j]] -= 1
+                    j = R[j]
+                i = D[i]
+
+    def deselect(self, cell, digit):
+        """Undo select(); selections must be undone in reverse order."""
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        node = self.first[cell * self.side + digit - 1]
+        for n in (node + 3, node + 2, node + 1, node):
+            c = C[n]
+            i = U[c]
+            while i != c:
+                j = L[i]
+                while j != i:
+                    S[C[j]] += 1
+                    U[D[j]] = j
+                    D[U[j]] = j
+                    j = L[j]
+                i = U[i]
+            L[R[c]] = c
+            R[L[c]] = c
+
+    def exclude(self, cell, digit):
+        """Take one candidate row out of the matrix (undo with include())."""
+        U, D, C, S = self.U, self.D, self.C, self.S
+        node = self.first[cell * self.side + digit - 1]
+        for n in (node, node + 1, node + 2, node + 3):
+            U[D[n]] = U[n]
+            D[U[n]] = D[n]
+            S[C[n]] -= 1
+
+    def include(self, cell, digit):
+        U, D, C, S = self.U, self.D, self.C, self.S
+        node = self.first[cell * self.side + digit - 1]
+        for n in (node + 3, node + 2, node + 1, node):
+            S[C[n]] += 1
+            U[D[n]] = n
+            D[U[n]] = n
+
+    def search(self, limit=1, solutions=None, max_nodes=None):
+        """
+        Algorithm X over the columns still uncovered, always branching on the
+        column with the fewest rows. Stops after `limit` solutions; each one
+        found is appended to `solutions` (if given) as a list of candidates.
+        Returns the number found, or None if it gave up after trying
+        `max_nodes` rows without reaching the limit or finishing the search.
+        The matrix is left as it was.
+        """
+        L, R, U, D, C, S, ROW = self.L, self.R, self.U, self.D, self.C, self.S, self.ROW
+
+        def cover(c):
+            L[R[c]] = L[c]
+            R[L[c]] = R[c]
+            i = D[c]
+            while i != c:
+                j = R[i]
+                while j != i:
+                    U[D[j]] = U[j]
+                    D[U[j]] = D[j]
+                    S[C[j]] -= 1
+                    j = R[j]
+                i = D[i]
+
+        def uncover(c):
+            i = U[c]
+            while i != c:
+                j = L[i]
+                while j != i:
+                    S[C[j]] += 1
+                    U[D[j]] = j
+                    D[U[j]] = j
+                    j = L[j]
+                i = U[i]
+            L[R[c]] = c
+            R[L[c]] = c
+
+        found = 0
+        budget = max_nodes if max_nodes is not None else -1  # rows left to try
+        chosen = []  # the row node picked at each depth
+        advance = False  # True: move the deepest choice on to its next row
+        while True:
+            if not advance:
+                if R[0] == 0:
+                    found += 1
+                    if solutions is not None:
+                        solutions.append([ROW[r] for r in chosen])
+                    if found >= limit:
+                        break
+                    advance = True
+                else:
+                    # Column with the fewest rows left; 0 or 1 can't be beaten.
+                    best = R[0]
+                    size = S[best]
+                    c = R[best]
+                    while c and size > 1:
+                        if S[c] < size:
+                            best, size = c, S[c]
+                        c = R[c]
+                    if size == 0:
+                        advance = True
+                    elif budget == 0:
+                        found = None
+                        break
+                    else:
+                        budget -= 1
+                        cover(best)
+                        r = D[best]
+                        chosen.append(r)
+                        j = R[r]
+                        while j != r:
+                            cover(C[j])
+                            j = R[j]
+                        continue
+            # Backtrack: undo the deepest choice and try the next row of its
+            # column, popping levels whose rows are used up.
+            while chosen:
+                r = chosen.pop()
+                j = L[r]
+                while j != r:
+                    uncover(C[j])
+                    j = L[j]
+                c = C[r]
+                r = D[r]
+                if r != c:
+                    if budget == 0:
+                        uncover(c)
+                        found = None
+                        break
+                    budget -= 1
+                    chosen.append(r)
+                    j = R[r]
+                    while j != r:
+                        cover(C[j])
+                        j = R[j]
+                    break
+                uncover(c)
+            else:
+                break
+            if found is None:
+                break
+            advance = False
+
+        # Stopped early at the limit or the budget: unwind the remaining choices.
+        while chosen:
+            r = chosen.pop()
+            j = L[r]
+            while j != r:
+                uncover(C[j])
+                j = L[j]
+            uncover(C[r])
+        return found
+
+
+_MATRICES = {}
+
+
+def matrix(box):
+    """The shared DancingLinks matrix for a box size (built on first use)."""
+    if box not in _MATRICES:
+        _MATRICES[box] = DancingLinks(box)
+    return _MATRICES[box]
+
+
+def box_of(grid):
+    """The box size of a flat grid, or ValueError if its length isn't a fourth power."""
+    box = round(len(grid) ** 0.25)
+    if not 1 < box <= MAX_BOX or box**4 != len(grid):
+        raise ValueError(f"a grid must have 16, 81, 256 or 625 cells, not {len(grid)}")
+    return box
+
+
+def has_conflict(grid, box):
+    """True if some row, column or box of the flat grid repeats a digit."""
+    side = box * box
+    seen = set()
+    for cell, v in enumerate(grid):
+        if v:
+            r, c = divmod(cell, side)
+            keys = (("r", r, v), ("c", c, v), ("b", r // box * box + c // box, v))
+            if not seen.isdisjoint(keys):
+                return True
+            seen.update(keys)
+    return False
+
+
+def _search(grid, limit, solutions=None):
+    """Select the givens of a conflict-free grid, search and deselect them."""
+    dlx = matrix(box_of(grid))
+    givens = [(cell, v) for cell, v in enumerate(grid) if v]
+    for cell, v in givens:
+        dlx.select(cell, v)
+    try:
+        return dlx.search(limit, solutions)
+    finally:
+        for cell, v in reversed(givens):
+            dlx.deselect(cell, v)
+
+
+def solve(grid):
+    """Solve a flat grid and return the solution as a new flat list, or None."""
+    box = box_of(grid)
+    if has_conflict(grid, box):
+        return None
+    solutions = []
+    if not _search(grid, 1, solutions):
+        return None
+    side = box * box
+    solution = list(grid)
+    for candidate in solutions[0]:
+        cell, d = divmod(candidate, side)
+        solution[cell] = d + 1
+    return solution
+
+
+def count_solutions(grid, limit=2):
+    """Count the solutions of a flat grid, stopping once `limit` are found."""
+    if has_conflict(grid, box_of(grid)):
+        return 0
+    return _search(grid, limit)
+
+
+def full_grid(box, rng=random):
+    """
+    A random complete grid. The boxes on the main diagonal share no row or
+    column, so they are filled with independent random permutations and the
+    solver completes the rest.
+    """
+    side = box * box
+    while True:
+        grid = [0] * (side * side)
+        for k in range(box):
+            digits = rng.sample(range(1, side + 1), side)
+            for i, d in enumerate(digits):
+                r, c = divmod(i, box)
+                grid[(k * box + r) * side + k * box + c] = d
+        solution = solve(grid)
+        if solution is not None:
+            return solution
+
+
+def remove_numbers(grid, removals, rng=random, max_nodes=UNIQUENESS_BUDGET):
+    """
+    Blank up to `removals` cells of a complete flat grid, in random order,
+    keeping the solution unique. A removal is kept only if no solution has
+    another digit in that cell, which is searched for by taking the original
+    candidate out of the matrix. A search that tries more than `max_nodes`
+    rows is abandoned and the cell stays filled, so the time per check is
+    bounded (None: no limit). Returns the puzzle as a new list.
+
+    All cells are selected up front, the first one to try on top, so each
+    cell is deselected in turn without touching the rest of the stack. Cells
+    that have to stay are reselected on top for every later check, until
+    there are enough of them to be worth moving under the unchecked cells
+    for good, which is far fewer selections than redoing every given each time.
+    """
+    puzzle = list(grid)
+    dlx = matrix(box_of(grid))
+    order = list(range(len(grid)))
+    rng.shuffle(order)
+    for cell in reversed(order):
+        dlx.select(cell, puzzle[cell])
+
+    fixed = []  # kept cells selected under the unchecked ones
+    kept = []  # kept cells reselected on top for each check
+    count = removals
+    for k, cell in enumerate(order):
+        if count <= 0:
+            # Cells from here on were never deselected.
+            for rest in order[k:]:
+                dlx.deselect(rest, puzzle[rest])
+            break
+        if len(kept) * len(kept) > len(order) - k:
+            # Reselecting `kept` every check now costs more than rebuilding the
+            # stack once.
+            for rest in order[k:]:
+                dlx.deselect(rest, puzzle[rest])
+            for other in kept:
+                dlx.select(other, puzzle[other])
+            for rest in reversed(order[k:]):
+                dlx.select(rest, puzzle[rest])
+            fixed += kept
+            kept = []
+        value = puzzle[cell]
+        dlx.deselect(cell, value)
+        for other in kept:
+            dlx.select(other, puzzle[other])
+        dlx.exclude(cell, value)
+        try:
+            other_solution = dlx.search(1, max_nodes=max_nodes)
+        finally:
+            dlx.include(cell, value)
+            for other in reversed(kept):
+                dlx.deselect(other, puzzle[other])
+        if other_solution is None or other_solution:
+            kept.append(cell)
+        else:
+            puzzle[cell] = 0
+            count -= 1
+    for other in reversed(fixed):
+        dlx.deselect(other, puzzle[other])
+    return puzzle
+
+
+def generate_puzzle(box, difficulty="medium", rng=random):
+    """Return (puzzle, solution) flat grids of a box size with a unique solution."""
+    solution = full_grid(box, rng)
+    removals = round(len(solution) * DIFFICULTY_FRACTIONS[difficulty])
+    return remove_numbers(solution, removals, rng), solution
+
+
+def parse_grid(text):
+    """Parse a grid string (SYMBOLS digits, '0' or '.' for empty) into a flat list."""
+    grid = [0 if ch in "0." else SYMBOLS.index(ch.upper()) + 1 for ch in text.strip()]
+    box_of(grid)
+    return grid
+
+
+def format_grid(grid):
+    """Format a flat grid as a string with '0' for empty cells."""
+    return "".join(SYMBOLS[v - 1] if v else "0" for v in grid)
+
+
+# --------------------------------------------------------------------------------
+# Scaling table
+# --------------------------------------------------------------------------------
+def scaling(boxes=(2, 3, 4, 5), seed=0, difficulty="medium"):
+    """Print the time taken to fill, generate and solve a grid of each size."""
+    print(f"{'grid':<8}{'fill':>12}{'generate':>12}{'solve':>12}{'blanks':>8}")
+    for box in boxes:
+        side = box * box
+        rng = random.Random(f"{seed}:{box}")
+
+        start = time.perf_counter()
+        full_grid(box, rng)
+        fill = time.perf_counter() - start
+
+        start = time.perf_counter()
+        puzzle, solution = generate_puzzle(box, difficulty, rng)
+        generate = time.perf_counter() - start
+
+        start = time.perf_counter()
+        assert solve(puzzle) == solution, "solver disagrees with the generator"
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"{f'{side}x{side}':<8}{fill * 1000:>10.1f}ms{generate * 1000:>10.1f}ms"
+            f"{elapsed * 1000:>10.1f}ms{puzzle.count(0):>8}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time the exact-cover engine by grid size."
+    )
+    parser.add_argument(
+        "sizes",
+        nargs="*",
+        type=int,
+        help="grid sides to time: 4, 9, 16 or 25 (default: all)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "-d", "--difficulty", choices=list(DIFFICULTY_FRACTIONS), default="medium"
+    )
+    args = parser.parse_args(argv)
+    sides = args.sizes or (4, 9, 16, 25)
+    if any(s not in (4, 9, 16, 25) for s in sides):
+        parser.error("grid sides must be 4, 9, 16 or 25")
+    scaling(tuple(round(s**0.5) for s in sides), args.seed, args.difficulty)
+
+
+if __name__ == "__main__":
+    main()
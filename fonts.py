@@ -0,0 +1,97 @@
+import json
+import os
+
+import pygame
+
+# Resolved font files are remembered between runs, because the first
+# SysFont() lookup scans every font installed on the system.
+FONT_CACHE_FILE = "fonts.cache"
+
+_resolved = None  # {"name|bold": [font path or None, fake bold]}
+_fonts = {}
+
+
+def _cache_key(name, bold):
+    return f"{name}|{int(bold)}"
+
+
+def _load_resolved():
+    global _resolved
+    if _resolved is not None:
+        return _resolved
+    _resolved = {}
+    try:
+        with open(FONT_CACHE_FILE, "r") as f:
+            data = json.load(f)
+        if data.get("pygame") == pygame.version.ver:
+            _resolved = {
+                key: entry
+                for key, entry in data.get("fonts", {}).items()
+                if entry[0] is None or os.path.exists(entry[0])
+            }
+    except (OSError, ValueError, AttributeError):
+        pass
+    return _resolved
+
+
+def _store_resolved():
+    try:
+        with open(FONT_CACHE_FILE, "w") as f:
+            json.dump({"pygame": pygame.version.ver, "fonts": _resolved}, f)
+    except OSError:
+        pass
+
+
+def resolve(name, bold=False):
+    """Return (font path, fake bold) for a system font, scanning only on a
+    cache miss."""
+    resolved = _load_resolved()
+    key = _cache_key(name, bold)
+    if key not in resolved:
+        found = []
+
+        def record(path, size, set_bold, set_italic):
+            found.append([path, set_bold])
+            return None
+
+        pygame.font.SysFont(name, 1, bold=bold, constructor=record)
+        resolved[key] = found[0]
+        _store_resolved()
+    path, fake_bold = resolved[key]
+    return path, fake_bold
+
+
+def get_font(name, size, bold=False):
+    """A pygame Font equivalent to SysFont(name, size, bold), built once per size."""
+    key = (name, size, bold)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        path, fake_bold = resolve(name, bold)
+        font = pygame.font.Font(path, size)
+        if fake_bold:
+            font.set_bold(True)
+        _fonts[key] = font
+    return font
+
+
+class LazyFont:
+    """
+    Stands in for a pygame Font that is only created the first time it is
+    used, so importing a module does not initialize pygame.font or scan the
+    system fonts.
+    """
+
+    __slots__ = ("name", "size", "bold")
+
+    def __init__(self, name, size, bold=False):
+        self.name = name
+        self.size = size
+        self.bold = bold
+
+    def get(self):
+        return get_font(self.name, self.size, self.bold)
+
+    def __getattr__(self, attr):
+        return getattr(self.get(), attr)
@@ -0,0 +1,90 @@
+import random
+
+from solver import (
+    ALL_DIGITS,
+    BOX_OF,
+    COL_OF,
+    DIGITS_OF_MASK,
+    ROW_OF,
+    build_masks,
+    flatten,
+    search,
+    solve_in_place,
+    unflatten,
+)
+
+# Cells blanked for each difficulty level.
+DIFFICULTY_REMOVALS = {"easy": 30, "medium": 40, "hard": 50}
+
+
+def has_other_solution(grid, rows, cols, boxes, i, value):
+    """
+    Return True if the flat grid (with cell i empty) can be solved with
+    anything other than `value` at i.
+
+    The grid is known to have one solution with `value` at i, so this is the
+    same as asking whether a solution counter would reach 2, but only the
+    branches that could produce a second solution are searched.
+    The grid and masks are left unchanged.
+    """
+    r, c, b = ROW_OF[i], COL_OF[i], BOX_OF[i]
+    mask = ~(rows[r] | cols[c] | boxes[b]) & ALL_DIGITS & ~(1 << (value - 1))
+    for d in DIGITS_OF_MASK[mask]:
+        bit = 1 << (d - 1)
+        grid[i] = d
+        rows[r] |= bit
+        cols[c] |= bit
+        boxes[b] |= bit
+        found = search(grid, rows, cols, boxes, limit=1)
+        rows[r] ^= bit
+        cols[c] ^= bit
+        boxes[b] ^= bit
+        grid[i] = 0
+        if found:
+            return True
+    return False
+
+
+def remove_numbers(board, removals=40, rng=random):
+    """
+    Create a puzzle by blanking up to `removals` cells of a full board while
+    keeping the solution unique.
+
+    Cells are tried in random order and a removal is only kept if the puzzle
+    still has exactly one solution. The grid and its masks are updated in place
+    between removals, so no search state is rebuilt. If the board runs out of
+    removable cells first, fewer than `removals` cells are blanked.
+    """
+    grid = flatten(board)
+    rows, cols, boxes = build_masks(grid)
+    order = list(range(81))
+    rng.shuffle(order)
+
+    count = removals
+    for i in order:
+        if count <= 0:
+            break
+        value = grid[i]
+        if not value:
+            continue
+        bit = 1 << (value - 1)
+        grid[i] = 0
+        rows[ROW_OF[i]] ^= bit
+        cols[COL_OF[i]] ^= bit
+        boxes[BOX_OF[i]] ^= bit
+        if has_other_solution(grid, rows, cols, boxes, i, value):
+            grid[i] = value
+            rows[ROW_OF[i]] |= bit
+            cols[COL_OF[i]] |= bit
+            boxes[BOX_OF[i]] |= bit
+        else:
+            count -= 1
+    return unflatten(grid)
+
+
+def generate_puzzle(difficulty="medium", rng=random):
+    """Return (puzzle, solution) for a difficulty level, with a unique solution."""
+    solution = [[0] * 9 for _ in range(9)]
+    solve_in_place(solution, rng)
+    puzzle = remove_numbers(solution, DIFFICULTY_REMOVALS[difficulty], rng)
+    return puzzle, solution
@@ -0,0 +1,469 @@
+"""
+Grade puzzles by the human solving techniques they need.
+
+    python3 grader.py puzzles.txt -o graded.txt
+    python3 puzzle_bank.py build graded.txt
+
+The grader repeatedly applies the easiest technique that makes progress,
+keeping every cell's candidates as a 9-bit mask. A puzzle's rating is the
+rating of the hardest technique it needed (on the Sudoku Explainer scale),
+and GUESS_RATING if the techniques below run out before the grid is full.
+next_hint() uses the same techniques to find one next placement for hints.
+"""
+
+import argparse
+import sys
+import time
+from collections import namedtuple
+from itertools import combinations
+
+from solver import (
+    ALL_DIGITS,
+    BOX_OF,
+    COL_OF,
+    DIGITS_OF_MASK,
+    PEERS,
+    POPCOUNT,
+    ROW_OF,
+    UNITS,
+    flatten,
+    parse_puzzle,
+)
+
+Grade = namedtuple("Grade", "rating hardest solved steps")
+Grade.__doc__ = """Result of grading a puzzle.
+rating: numeric difficulty (rating of the hardest technique used).
+hardest: name of that technique.
+solved: False if the puzzle needed guessing beyond the known techniques.
+steps: {technique name: number of times it made progress}."""
+
+Hint = namedtuple("Hint", "cell digit technique")
+Hint.__doc__ = """The next logical placement found by next_hint.
+cell: flat index (0-80) of the cell to fill.
+digit: the digit that goes there.
+technique: name of the hardest technique needed to find it."""
+
+GUESS_RATING = 10.0
+
+# Rating at or below which a puzzle lands in each bucket, easiest first.
+BUCKETS = (("easy", 1.5), ("medium", 2.8), ("hard", float("inf")))
+
+# (line cells, line cells outside the box, box cells outside the line) for
+# every row/box and column/box intersection, used by locked candidates.
+INTERSECTIONS = []
+for _unit in UNITS[:18]:
+    for _box in sorted({BOX_OF[i] for i in _unit}):
+        _segment = [i for i in _unit if BOX_OF[i] == _box]
+        INTERSECTIONS.append(
+            (
+                _segment,
+                [i for i in _unit if BOX_OF[i] != _box],
+                [i for i in UNITS[18 + _box] if i not in _segment],
+            )
+        )
+
+
+def initial_candidates(grid):
+    """Candidate masks for every cell of a flat grid (0 for filled cells)."""
+    rows = [0] * 9
+    cols = [0] * 9
+    boxes = [0] * 9
+    for i, v in enumerate(grid):
+        if v:
+            bit = 1 << (v - 1)
+            rows[ROW_OF[i]] |= bit
+            cols[COL_OF[i]] |= bit
+            boxes[BOX_OF[i]] |= bit
+    return [
+        (
+            0
+            if grid[i]
+            else ~(rows[ROW_OF[i]] | cols[COL_OF[i]] | boxes[BOX_OF[i]]) & ALL_DIGITS
+        )
+        for i in range(81)
+    ]
+
+
+def place(grid, cands, i, digit):
+    """Fill cell i and remove the digit from its peers' candidates."""
+    grid[i] = digit
+    cands[i] = 0
+    keep = ~(1 << (digit - 1))
+    for p in PEERS[i]:
+        cands[p] &= keep
+
+
+# (unit, slot bit) pairs for each cell's row, column and box.
+CELL_SLOTS = [
+    [(u, 1 << unit.index(i)) for u, unit in enumerate(UNITS) if i in unit]
+    for i in range(81)
+]
+
+
+def digit_positions(cands):
+    """table[d][u] = 9-bit mask of the slots of UNITS[u] where digit d+1 can go."""
+    table = [[0] * 27 for _ in range(9)]
+    for i in range(81):
+        m = cands[i]
+        if m:
+            (ru, rbit), (cu, cbit), (bu, bbit) = CELL_SLOTS[i]
+            for d in DIGITS_OF_MASK[m]:
+                positions = table[d - 1]
+                positions[ru] |= rbit
+                positions[cu] |= cbit
+                positions[bu] |= bbit
+    return table
+
+
+def _eliminate(cands, cells, mask):
+    """Clear mask from the candidates of cells. Returns True if anything changed."""
+    changed = False
+    for i in cells:
+        if cands[i] & mask:
+            cands[i] &= ~mask
+            changed = True
+    return changed
+
+
+# --------------------------------------------------------------------------------
+# Techniques: each takes (grid, cands), applies every deduction it finds and
+# returns True if it made progress.
+# --------------------------------------------------------------------------------
+def hidden_single(grid, cands):
+    progress = False
+    for unit in UNITS:
+        once = twice = 0
+        for i in unit:
+            m = cands[i]
+            twice |= once & m
+            once |= m
+        singles = once & ~twice
+        while singles:
+            bit = singles & -singles
+            singles ^= bit
+            for i in unit:
+                if cands[i] & bit:
+                    place(grid, cands, i, DIGITS_OF_MASK[bit][0])
+                    progress = True
+                    break
+    return progress
+
+
+def naked_single(grid, cands):
+    progress = False
+    for i in range(81):
+        m = cands[i]
+        if m and not m & (m - 1):
+            place(grid, cands, i, DIGITS_OF_MASK[m][0])
+            progress = True
+    return progress
+
+
+def pointing(grid, cands):
+    """A digit confined to one line within a box is removed from the rest of the
+    line."""
+    progress = False
+    for segment, line_rest, box_rest in INTERSECTIONS:
+        seg = cands[segment[0]] | cands[segment[1]] | cands[segment[2]]
+        outside = 0
+        for i in box_rest:
+            outside |= cands[i]
+        locked = seg & ~outside
+        if locked and _eliminate(cands, line_rest, locked):
+            progress = True
+    return progress
+
+
+def claiming(grid, cands):
+    """A digit confined to one box within a line is removed from the rest of the box."""
+    progress = False
+    for segment, line_rest, box_rest in INTERSECTIONS:
+        seg = cands[segment[0]] | cands[segment[1]] | cands[segment[2]]
+        outside = 0
+        for i in line_rest:
+            outside |= cands[i]
+        locked = seg & ~outside
+        if locked and _eliminate(cands, box_rest, locked):
+            progress = True
+    return progress
+
+
+def _naked_subset(cands, size):
+    progress = False
+    for unit in UNITS:
+        cells = [i for i in unit if 2 <= POPCOUNT[cands[i]] <= size]
+        if len(cells) < size:
+            continue
+        for combo in combinations(cells, size):
+            union = 0
+            for i in combo:
+                union |= cands[i]
+            if POPCOUNT[union] == size:
+                others = [i for i in unit if i not in combo]
+                if _eliminate(cands, others, union):
+                    progress = True
+    return progress
+
+
+def _hidden_subset(cands, size):
+    progress = False
+    table = digit_positions(cands)
+    for u, unit in enumerate(UNITS):
+        # positions[d] = 9-bit mask of unit slots where digit d+1 can go
+        positions = [table[d][u] for d in range(9)]
+        digits = [d for d in range(9) if 2 <= POPCOUNT[positions[d]] <= size]
+        if len(digits) < size:
+            continue
+        changed = False
+        for combo in combinations(digits, size):
+            slots = 0
+            keep = 0
+            for d in combo:
+                slots |= positions[d]
+                keep |= 1 << d
+            if POPCOUNT[slots] != size:
+                continue
+            for slot in range(9):
+                i = unit[slot]
+                if slots >> slot & 1 and cands[i] & ~keep:
+                    cands[i] &= keep
+                    changed = True
+        if changed:
+            progress = True
+            table = digit_positions(cands)
+    return progress
+
+
+def _fish(cands, size):
+    progress = False
+    table = digit_positions(cands)
+    for d in range(9):
+        bit = 1 << d
+        for base, cover in ((0, UNITS[9:18]), (9, UNITS[:9])):
+            # positions of the digit along each base line (rows, then columns)
+            lines = []
+            for line_index in range(9):
+                positions = table[d][base + line_index]
+                if 2 <= POPCOUNT[positions] <= size:
+                    lines.append((line_index, positions))
+            if len(lines) < size:
+                continue
+            for combo in combinations(lines, size):
+                slots = 0
+                for _, positions in combo:
+                    slots |= positions
+                if POPCOUNT[slots] != size:
+                    continue
+                used = {line_index for line_index, _ in combo}
+                for slot in range(9):
+                    if slots >> slot & 1:
+                        others = [i for k, i in enumerate(cover[slot]) if k not in used]
+                        if _eliminate(cands, others, bit):
+                            progress = True
+                            table = digit_positions(cands)
+    return progress
+
+
+def naked_pair(grid, cands):
+    return _naked_subset(cands, 2)
+
+
+def naked_triple(grid, cands):
+    return _naked_subset(cands, 3)
+
+
+def hidden_pair(grid, cands):
+    return _hidden_subset(cands, 2)
+
+
+def hidden_triple(grid, cands):
+    return _hidden_subset(cands, 3)
+
+
+def x_wing(grid, cands):
+    return _fish(cands, 2)
+
+
+def swordfish(grid, cands):
+    return _fish(cands, 3)
+
+
+def xy_wing(grid, cands):
+    """Pivot {a,b} with pincers {a,c} and {b,c}: c is removed from cells seeing
+    both pincers."""
+    progress = False
+    for pivot in range(81):
+        pm = cands[pivot]
+        if POPCOUNT[pm] != 2:
+            continue
+        wings = [p for p in PEERS[pivot] if POPCOUNT[cands[p]] == 2 and cands[p] != pm]
+        for x, y in combinations(wings, 2):
+            xm, ym = cands[x], cands[y]
+            if xm & ym & pm or (xm | ym) & pm != pm:
+                continue
+            c = xm & ym
+            if POPCOUNT[c] != 1:
+                continue
+            common = set(PEERS[x]).intersection(PEERS[y])
+            common.discard(pivot)
+            if _eliminate(cands, common, c):
+                progress = True
+    return progress
+
+
+# (name, rating, function) in the order they are tried
+TECHNIQUES = (
+    ("hidden single", 1.5, hidden_single),
+    ("naked single", 2.3, naked_single),
+    ("pointing", 2.6, pointing),
+    ("claiming", 2.8, claiming),
+    ("naked pair", 3.0, naked_pair),
+    ("x-wing", 3.2, x_wing),
+    ("hidden pair", 3.4, hidden_pair),
+    ("naked triple", 3.6, naked_triple),
+    ("swordfish", 3.8, swordfish),
+    ("hidden triple", 4.0, hidden_triple),
+    ("xy-wing", 4.2, xy_wing),
+)
+
+
+def grade(board):
+    """Grade a 9x9 puzzle (or an 81-character string) and return a Grade."""
+    if isinstance(board, str):
+        board = parse_puzzle(board)
+    grid = flatten(board)
+    cands = initial_candidates(grid)
+    steps = {}
+    rating = 0.0
+    hardest = None
+
+    while 0 in grid:
+        for name, technique_rating, technique in TECHNIQUES:
+            if technique(grid, cands):
+                steps[name] = steps.get(name, 0) + 1
+                if technique_rating > rating:
+                    rating, hardest = technique_rating, name
+                break
+        else:
+            return Grade(GUESS_RATING, "guess", False, steps)
+        if any(not grid[i] and not cands[i] for i in range(81)):
+            return Grade(GUESS_RATING, "guess", False, steps)
+    return Grade(rating, hardest, True, steps)
+
+
+def find_single(cands):
+    """The first (cell, digit, technique) single in the candidates, or None.
+    Hidden singles are looked for first, as in grading."""
+    for unit in UNITS:
+        once = twice = 0
+        for i in unit:
+            m = cands[i]
+            twice |= once & m
+            once |= m
+        singles = once & ~twice
+        if singles:
+            bit = singles & -singles
+            for i in unit:
+                if cands[i] & bit:
+                    return i, DIGITS_OF_MASK[bit][0], "hidden single"
+    for i in range(81):
+        m = cands[i]
+        if m and not m & (m - 1):
+            return i, DIGITS_OF_MASK[m][0], "naked single"
+    return None
+
+
+# Techniques that only eliminate candidates; singles are found by find_single.
+ELIMINATIONS = tuple(t for t in TECHNIQUES if t[2] not in (hidden_single, naked_single))
+RATINGS = {name: technique_rating for name, technique_rating, _ in TECHNIQUES}
+
+
+def hint_search(grid, cands):
+    """
+    next_hint() one elimination pass at a time, so a caller can spread the
+    search over several calls. Yields None after each pass that leaves no
+    single, then the Hint once one is found; stops without a Hint if the
+    known techniques are not enough. cands is modified as in next_hint().
+    """
+    hardest = None
+    while True:
+        found = find_single(cands)
+        if found is not None:
+            i, digit, name = found
+            if hardest is not None and RATINGS[hardest] > RATINGS[name]:
+                name = hardest
+            yield Hint(i, digit, name)
+            return
+        for name, technique_rating, technique in ELIMINATIONS:
+            progress = technique(grid, cands)
+            yield None
+            if progress:
+                if hardest is None or technique_rating > RATINGS[hardest]:
+                    hardest = name
+                break
+        else:
+            return
+
+
+def next_hint(grid, cands):
+    """
+    Find the next placement a human could deduce. grid is a flat list of
+    placed digits and cands the matching candidate masks; cands is modified
+    by any eliminations. Eliminating techniques are applied, easiest first,
+    only until a single appears. Returns a Hint, or None if the known
+    techniques are not enough.
+    """
+    for found in hint_search(grid, cands):
+        if found is not None:
+            return found
+    return None
+
+
+def bucket(rating):
+    """Difficulty bucket name for a rating."""
+    for name, limit in BUCKETS:
+        if rating <= limit:
+            return name
+    return BUCKETS[-1][0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Grade batch.py output and relabel each line with its bucket."
+    )
+    parser.add_argument("input", help="batch.py output file ('-' for stdin)")
+    parser.add_argument(
+        "-o", "--output", default="-", help="output file (default: stdout)"
+    )
+    args = parser.parse_args(argv)
+
+    src = sys.stdin if args.input == "-" else open(args.input)
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    counts = {name: 0 for name, _ in BUCKETS}
+    start = time.perf_counter()
+    try:
+        for line in src:
+            if not line.strip():
+                continue
+            _, puzzle, solution = line.split()
+            label = bucket(grade(puzzle).rating)
+            counts[label] += 1
+            out.write(f"{label} {puzzle} {solution}\n")
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    total = sum(counts.values())
+    summary = ", ".join(f"{name}: {count}" for name, count in counts.items())
+    print(
+        f"graded {total} puzzles in {elapsed:.2f}s"
+        f" ({total / elapsed:.0f}/sec) - {summary}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
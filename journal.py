@@ -0,0 +1,160 @@
+import struct
+from collections import namedtuple
+
+# Every change to a board is an event in an append-only log. A record is
+# fixed-size (little-endian): u8 kind, u8 cell, u8 old value, u8 new value,
+# u16 old notes, u16 new notes, u32 game time in seconds. Undo and redo are
+# logged as events too, carrying the move they revert or re-apply, so
+# replaying a log rebuilds both the board and its undo/redo history, even for
+# moves made before the snapshot the log starts from.
+RECORD = struct.Struct("<BBBBHHI")
+
+MOVE = 0
+UNDO = 1
+REDO = 2
+AUTO_NOTES_ON = 3
+AUTO_NOTES_OFF = 4
+
+Move = namedtuple("Move", "cell old_value old_notes new_value new_notes time")
+
+
+class Journal:
+    """
+    Move history of a Board with O(1) undo and redo.
+
+    All moves go through play(), undo() and redo() (and set_auto_notes()),
+    which change the board and append an event record. take_unsaved() returns
+    the records logged since the last call, a few bytes per move, for the
+    caller to append to the save journal; replay() applies such records to a
+    board restored from the matching snapshot.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.history = []  # Move objects; history[:cursor] are applied
+        self.cursor = 0
+        self.tail_length = 0  # records logged since the last snapshot
+        self._unsaved = bytearray()
+
+    def _log(self, kind, move=None, time=0):
+        if move is None:
+            record = RECORD.pack(kind, 0, 0, 0, 0, 0, time)
+        else:
+            record = RECORD.pack(
+                kind,
+                move.cell,
+                move.old_value,
+                move.new_value,
+                move.old_notes,
+                move.new_notes,
+                time,
+            )
+        self._unsaved += record
+        self.tail_length += 1
+
+    def _apply(self, cell, value, notes):
+        """Put one cell back into a recorded state."""
+        board = self.board
+        if board.values[cell] != value:
+            board.set_cell_value(cell // 9, cell % 9, value)
+        board.notes[cell] = notes
+
+    def play(self, row, col, value, note_mode=False, time=0):
+        """
+        Make a move (as Board.set_cell_value) and record it. Anything that was
+        undone is dropped from the redo history. Returns the Move, or None if
+        the move changed nothing.
+        """
+        board = self.board
+        cell = row * 9 + col
+        old_value, old_notes = board.values[cell], board.notes[cell]
+        board.set_cell_value(row, col, value, note_mode)
+        new_value, new_notes = board.values[cell], board.notes[cell]
+        if (old_value, old_notes) == (new_value, new_notes):
+            return None
+        move = Move(cell, old_value, old_notes, new_value, new_notes, time)
+        del self.history[self.cursor :]
+        self.history.append(move)
+        self.cursor += 1
+        self._log(MOVE, move, time)
+        return move
+
+    def undo(self, time=0):
+        """Revert the last applied move. Returns its (row, col), or None."""
+        if self.cursor == 0:
+            return None
+        self.cursor -= 1
+        move = self.history[self.cursor]
+        self._apply(move.cell, move.old_value, move.old_notes)
+        self._log(UNDO, move, time)
+        return divmod(move.cell, 9)
+
+    def redo(self, time=0):
+        """Re-apply the last undone move. Returns its (row, col), or None."""
+        if self.cursor == len(self.history):
+            return None
+        move = self.history[self.cursor]
+        self.cursor += 1
+        self._apply(move.cell, move.new_value, move.new_notes)
+        self._log(REDO, move, time)
+        return divmod(move.cell, 9)
+
+    def can_undo(self):
+        return self.cursor > 0
+
+    def can_redo(self):
+        return self.cursor < len(self.history)
+
+    def set_auto_notes(self, enabled, time=0):
+        """Turn the board's auto-notes on or off and record it, so a replay
+        updates notes the same way."""
+        self.board.set_auto_notes(enabled)
+        self._log(AUTO_NOTES_ON if enabled else AUTO_NOTES_OFF, time=time)
+
+    def take_unsaved(self):
+        """Return the records logged since the last call and forget them."""
+        records = bytes(self._unsaved)
+        self._unsaved.clear()
+        return records
+
+    def snapshot_taken(self):
+        """Note that the board state was saved in full, so the log restarts."""
+        self._unsaved.clear()
+        self.tail_length = 0
+
+    def replay(self, records):
+        """
+        Apply logged records to the board (restored from the snapshot they
+        follow), rebuilding the undo/redo history. A torn record at the end is
+        ignored. Returns the latest game time seen in the records.
+        """
+        board = self.board
+        history = self.history
+        latest = 0
+        end = len(records) - len(records) % RECORD.size
+        for record in RECORD.iter_unpack(records[:end]):
+            kind, cell, old_value, new_value, old_notes, new_notes, time = record
+            latest = max(latest, time)
+            move = Move(cell, old_value, old_notes, new_value, new_notes, time)
+            if kind == MOVE:
+                self._apply(cell, new_value, new_notes)
+                del history[self.cursor :]
+                history.append(move)
+                self.cursor += 1
+            elif kind == UNDO:
+                self._apply(cell, old_value, old_notes)
+                if self.cursor:
+                    self.cursor -= 1
+                else:
+                    # The move was made before the snapshot; it can be redone now.
+                    history.insert(0, move)
+            elif kind == REDO:
+                self._apply(cell, new_value, new_notes)
+                if self.cursor == len(history):
+                    # Undone before the snapshot; it can be undone again now.
+                    history.append(move)
+                self.cursor += 1
+            elif kind in (AUTO_NOTES_ON, AUTO_NOTES_OFF):
+                board.set_auto_notes(kind == AUTO_NOTES_ON)
+        self.tail_length += end // RECORD.size
+        return latest
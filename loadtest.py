@@ -0,0 +1,180 @@
+"""
+Load-test client for service.py.
+
+    python3 service.py &
+    python3 loadtest.py -e solve -c 64 -n 20000
+    python3 loadtest.py -e generate --difficulty hard -c 8 --duration 10
+    python3 loadtest.py -e solve -e validate -c 32 -n 5000 -o load.json
+
+Opens `--concurrency` keep-alive connections, each sending its next request
+as soon as the previous answer arrives, and cycles through the chosen
+endpoints. Reports throughput, latency percentiles and the count of each
+response status. The solve and validate payloads are the solver's reference
+puzzles and their solutions.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from itertools import cycle
+
+from service import HOST, PORT
+from solver import BENCH_PUZZLES, format_puzzle, parse_puzzle, solve
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def build_requests(endpoints, difficulty):
+    """The (method, target, body) requests each connection cycles through."""
+    puzzles = list(BENCH_PUZZLES.values())
+    solutions = [format_puzzle(solve(parse_puzzle(p))) for p in puzzles]
+    requests = []
+    for endpoint in endpoints:
+        if endpoint == "generate":
+            requests.append(("GET", f"/generate?difficulty={difficulty}", b""))
+        elif endpoint == "solve":
+            requests += [
+                ("POST", "/solve", json.dumps({"puzzle": p}).encode()) for p in puzzles
+            ]
+        else:
+            requests += [
+                ("POST", "/validate", json.dumps({"grid": g}).encode())
+                for g in puzzles + solutions
+            ]
+    return requests
+
+
+def _encode(method, target, body, host):
+    head = (
+        f"{method} {target} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+    )
+    return head.encode() + body
+
+
+async def _read_response(reader):
+    """Read one response and return its status code."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    length = 0
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def _client(host, port, requests, state, deadline, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for request in cycle(requests):
+            if state["left"] <= 0 or time.perf_counter() >= deadline:
+                break
+            state["left"] -= 1
+            start = time.perf_counter()
+            writer.write(request)
+            try:
+                status = await _read_response(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                statuses["disconnected"] += 1
+                break
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+    finally:
+        writer.close()
+
+
+async def run(host, port, endpoints, concurrency, count, duration, difficulty="medium"):
+    """Run the load test. Returns a summary dict."""
+    requests = [_encode(*r, host) for r in build_requests(endpoints, difficulty)]
+    state = {"left": count or float("inf")}
+    latencies = []
+    statuses = Counter()
+    start = time.perf_counter()
+    deadline = start + duration if duration else float("inf")
+    # Each connection starts at a different request so the mix stays even.
+    clients = []
+    for i in range(concurrency):
+        k = i % len(requests)
+        own = requests[k:] + requests[:k]
+        clients.append(_client(host, port, own, state, deadline, latencies, statuses))
+    await asyncio.gather(*clients)
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    last = len(ordered) - 1
+    latency_ms = {}
+    if ordered:
+        for p in PERCENTILES:
+            latency_ms[f"p{p}"] = round(ordered[round(last * p / 100)] * 1000, 3)
+        latency_ms["max"] = round(ordered[-1] * 1000, 3)
+    return {
+        "endpoints": endpoints,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "throughput": round(len(latencies) / elapsed, 1),
+        "latency_ms": latency_ms,
+        "statuses": {str(k): v for k, v in sorted(statuses.items(), key=str)},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the Sudoku service.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument(
+        "-e",
+        "--endpoint",
+        dest="endpoints",
+        action="append",
+        choices=("solve", "generate", "validate"),
+        help="endpoint to call (repeatable; default: solve)",
+    )
+    parser.add_argument("--difficulty", default="medium", help="for /generate")
+    parser.add_argument(
+        "-c", "--concurrency", type=int, default=32, help="open connections"
+    )
+    parser.add_argument("-n", "--count", type=int, default=None, help="total requests")
+    parser.add_argument("--duration", type=float, default=None, help="seconds to run")
+    parser.add_argument(
+        "-o", "--output", help="also write the summary as JSON to this file"
+    )
+    args = parser.parse_args(argv)
+    if not args.count and not args.duration:
+        args.count = 5000
+
+    try:
+        summary = asyncio.run(
+            run(
+                args.host,
+                args.port,
+                args.endpoints or ["solve"],
+                args.concurrency,
+                args.count,
+                args.duration,
+                args.difficulty,
+            )
+        )
+    except OSError as e:
+        sys.exit(f"cannot reach the service at {args.host}:{args.port}: {e}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    latency = summary["latency_ms"]
+    print(
+        f"{summary['requests']} requests in {summary['seconds']:.2f}s "
+        f"({summary['throughput']:.0f} req/sec) with {args.concurrency} connections"
+    )
+    if latency:
+        print("latency ms: " + "  ".join(f"{k} {v:.2f}" for k, v in latency.items()))
+    print("statuses: " + ", ".join(f"{k}: {v}" for k, v in summary["statuses"].items()))
+
+
+if __name__ == "__main__":
+    main()
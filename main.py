@@ -1,3 +1,7 @@
+import time
+
+_PROCESS_START = time.perf_counter()
+
 import pygame
 import sys
 from board import (
@@ -6,20 +10,68 @@ from board import (
     remove_numbers,
     WINDOW_WIDTH,
     WINDOW_HEIGHT,
-    BOARD_OFFSET_X,
-    BOARD_OFFSET_Y,
-    CELL_SIZE,
-    BOARD_SIZE,
+    theme,
 )
-from save import save_game, load_game, clear_save
-from animation import check_number_animation, draw_animation_event, ANIM_DURATION
+from generator import DIFFICULTY_REMOVALS
+from journal import Journal
+from prefetch import PuzzlePrefetcher
+from puzzle_bank import open_bank
+from profiler import NULL_PROFILER, FrameProfiler
+from render import RenderScheduler
+from render_cache import CACHE
+from save import SaveWorker, load_game
+from symmetry import random_transform
+from fonts import LazyFont
+from animation import (
+    Timeline,
+    number_animation_events,
+    unit_animation_event,
+    warm_fade_frames,
+)
+
+# Fonts (created on first use; see fonts.py)
+FONT_SMALL = LazyFont("sans", 18)
+FONT_MENU = LazyFont("sans", 40)
+FONT_TITLE = LazyFont("sans", 50)
+
+# A full save is written once this many records are in the journal; other
+# moves only append a record of a few bytes to it.
+SNAPSHOT_INTERVAL = 64
+
+# Run with --startup-timing to print how long each startup phase took.
+STARTUP_TIMING = "--startup-timing" in sys.argv
+# Run with --profile to time every frame from the start (F3 also turns it on).
+PROFILE = "--profile" in sys.argv
+_startup_marks = [("process start", _PROCESS_START)]
+
 
-pygame.init()
+def mark_startup(label):
+    """Record a startup milestone. The report is printed at the first menu frame."""
+    if _startup_marks:
+        _startup_marks.append((label, time.perf_counter()))
+
+
+def report_startup():
+    """Print the startup milestones once (if --startup-timing was given)."""
+    if not _startup_marks:
+        return
+    if STARTUP_TIMING:
+        previous = _startup_marks[0][1]
+        for label, when in _startup_marks[1:]:
+            print(f"{label:<20}{(when - previous) * 1000:8.1f} ms")
+            previous = when
+        total = _startup_marks[-1][1] - _startup_marks[0][1]
+        print(f"{'time to first frame':<20}{total * 1000:8.1f} ms")
+    _startup_marks.clear()
+
+
+def init_pygame():
+    """Initialize only the pygame subsystems the game uses (no audio, joystick etc.)."""
+    pygame.display.init()
+    pygame.font.init()
+    # Creating a Clock starts SDL's timer, which pygame.time.get_ticks() needs.
+    pygame.time.Clock()
 
-# Fonts
-FONT_SMALL = pygame.font.SysFont("sans", 18)
-FONT_MENU = pygame.font.SysFont("sans", 40)
-FONT_TITLE = pygame.font.SysFont("sans", 50)
 
 # Colors
 COLOR_BG = (240, 240, 240)
@@ -36,63 +88,128 @@ class NumberButton:
     def draw(self, win):
         if not self.visible:
             return
-        # Draw a background for the button (light gray) and a border.
-        pygame.draw.rect(win, (200, 200, 200), self.rect)
-        pygame.draw.rect(win, (50, 50, 50), self.rect, 2)
-        # Render the button's number.
-        text_surf = FONT_SMALL.render(str(self.number), True, (50, 50, 50))
-        win.blit(
+        face = CACHE.layer(("button", self.number, self.rect.size), self._build_face)
+        win.blit(face, self.rect)
+
+    def _build_face(self):
+        """Pre-render the button: light gray background, border and number."""
+        face = pygame.Surface(self.rect.size)
+        face_rect = face.get_rect()
+        face.fill((200, 200, 200))
+        pygame.draw.rect(face, (50, 50, 50), face_rect, 2)
+        text_surf = CACHE.text(FONT_SMALL, str(self.number), (50, 50, 50))
+        face.blit(
             text_surf,
             (
-                self.rect.x + (self.rect.width - text_surf.get_width()) // 2,
-                self.rect.y + (self.rect.height - text_surf.get_height()) // 2,
+                (face_rect.width - text_surf.get_width()) // 2,
+                (face_rect.height - text_surf.get_height()) // 2,
             ),
         )
+        return face
 
 
-def draw_top_bar(win, timer_str):
-    """Draw a top header with the game title and timer."""
-    pygame.draw.rect(win, COLOR_HEADER, (0, 0, WINDOW_WIDTH, 80))
+def _build_background():
+    """Static parts of the game screen: background, header bar and title."""
+    surf = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+    surf.fill(COLOR_BG)
+    pygame.draw.rect(surf, COLOR_HEADER, (0, 0, WINDOW_WIDTH, 80))
     title_surf = FONT_TITLE.render("SUDŌKU", True, COLOR_HEADER_TEXT)
-    win.blit(
+    surf.blit(
         title_surf,
         (
             WINDOW_WIDTH // 2 - title_surf.get_width() // 2,
             40 - title_surf.get_height() // 2,
         ),
     )
+    return surf
+
+
+def background_layer():
+    """The cached static background of the game screen."""
+    return CACHE.layer("background", _build_background)
+
+
+def draw_top_bar(win, timer_str):
+    """Draw a top header with the game title and timer."""
+    win.blit(background_layer(), (0, 0), (0, 0, WINDOW_WIDTH, 80))
     # Timer on the right
     timer_surf = FONT_SMALL.render(timer_str, True, COLOR_HEADER_TEXT)
     win.blit(timer_surf, (WINDOW_WIDTH - 70, 30))
 
 
-def redraw_window(win, board, note_mode, message, animations, timer_str):
-    """Draw everything: background, top bar, board, animations, etc."""
-    win.fill(COLOR_BG)
-
-    # Draw top bar with the timer
+def draw_header(win, note_mode, message, timer_str):
+    """Draw the top bar with the timer, note mode info and optional message."""
     draw_top_bar(win, timer_str)
 
-    # Draw note mode info and optional message
     mode_text = "Note Mode: ON" if note_mode else "Note Mode: OFF"
-    mode_surf = FONT_SMALL.render(mode_text, True, (255, 255, 255))
+    mode_surf = CACHE.text(FONT_SMALL, mode_text, (255, 255, 255))
     win.blit(mode_surf, (20, 30))
 
     if message:
-        msg_surf = FONT_SMALL.render(message, True, (255, 80, 80))
+        msg_surf = CACHE.text(FONT_SMALL, message, (255, 80, 80))
         win.blit(msg_surf, (20, 55))
 
+
+def redraw_window(
+    win, board, note_mode, message, timeline, timer_str, profiler=NULL_PROFILER
+):
+    """Draw everything: background, top bar, board, animations, etc."""
+    CACHE.validate(win.get_size(), theme())
+    win.blit(background_layer(), (0, 0))
+    draw_header(win, note_mode, message, timer_str)
+
     # Draw the board
     board.draw(win)
+    profiler.mark("draw")
 
     # Draw any active animations
-    if animations:
-        current_time = pygame.time.get_ticks()
-        animations[:] = [
-            anim for anim in animations if draw_animation_event(win, anim, current_time)
-        ]
+    if timeline:
+        timeline.update(pygame.time.get_ticks())
+        timeline.draw(win)
+    profiler.mark("animations")
 
+    if profiler.overlay_visible:
+        profiler.draw_overlay(win)
     pygame.display.update()
+    profiler.mark("display")
+
+
+def redraw_dirty(
+    win,
+    board,
+    note_mode,
+    message,
+    timeline,
+    timer_str,
+    scheduler,
+    profiler=NULL_PROFILER,
+):
+    """Redraw only what the scheduler marked as changed and push just those
+    rectangles to the screen."""
+    if scheduler.full:
+        redraw_window(win, board, note_mode, message, timeline, timer_str, profiler)
+        scheduler.clear()
+        return
+
+    CACHE.validate(win.get_size(), theme())
+    # Active animations cover their cells, so those cells are redrawn under them.
+    # This includes the frame an animation ends on, which clears its overlay.
+    if timeline:
+        for rect in timeline.update(pygame.time.get_ticks()):
+            scheduler.invalidate_rect(rect)
+    if scheduler.header:
+        draw_header(win, note_mode, message, timer_str)
+    board.draw_cells(win, scheduler.cells)
+    profiler.mark("draw")
+    timeline.draw(win)
+    profiler.mark("animations")
+
+    rects = scheduler.rects()
+    if profiler.overlay_visible:
+        rects.append(profiler.draw_overlay(win))
+    pygame.display.update(rects)
+    scheduler.clear()
+    profiler.mark("display")
 
 
 def difficulty_menu(win):
@@ -102,16 +219,16 @@ def difficulty_menu(win):
     while running:
         win.fill(COLOR_BG)
         pygame.draw.rect(win, COLOR_HEADER, (0, 0, WINDOW_WIDTH, 80))
-        title = FONT_MENU.render("Select Difficulty", True, COLOR_HEADER_TEXT)
+        title = CACHE.text(FONT_MENU, "Select Difficulty", COLOR_HEADER_TEXT)
         win.blit(
             title,
             (WINDOW_WIDTH // 2 - title.get_width() // 2, 40 - title.get_height() // 2),
         )
 
         # "Buttons"
-        easy_text = FONT_MENU.render("Easy", True, (50, 50, 50))
-        medium_text = FONT_MENU.render("Medium", True, (50, 50, 50))
-        hard_text = FONT_MENU.render("Hard", True, (50, 50, 50))
+        easy_text = CACHE.text(FONT_MENU, "Easy", (50, 50, 50))
+        medium_text = CACHE.text(FONT_MENU, "Medium", (50, 50, 50))
+        hard_text = CACHE.text(FONT_MENU, "Hard", (50, 50, 50))
 
         easy_rect = easy_text.get_rect(center=(WINDOW_WIDTH // 2, 200))
         medium_rect = medium_text.get_rect(center=(WINDOW_WIDTH // 2, 270))
@@ -155,24 +272,27 @@ def main_menu():
     while running:
         win.fill(COLOR_BG)
         pygame.draw.rect(win, COLOR_HEADER, (0, 0, WINDOW_WIDTH, 80))
-        title = FONT_TITLE.render("Sudoku", True, COLOR_HEADER_TEXT)
+        title = CACHE.text(FONT_TITLE, "Sudoku", COLOR_HEADER_TEXT)
         win.blit(
             title,
             (WINDOW_WIDTH // 2 - title.get_width() // 2, 40 - title.get_height() // 2),
         )
 
-        new_game_text = FONT_MENU.render("New Game", True, (50, 50, 50))
+        new_game_text = CACHE.text(FONT_MENU, "New Game", (50, 50, 50))
         new_game_rect = new_game_text.get_rect(center=(WINDOW_WIDTH // 2, 200))
         win.blit(new_game_text, new_game_rect)
 
         if resume_exists:
-            resume_text = FONT_MENU.render("Resume Game", True, (50, 50, 50))
+            resume_text = CACHE.text(FONT_MENU, "Resume Game", (50, 50, 50))
             resume_rect = resume_text.get_rect(center=(WINDOW_WIDTH // 2, 300))
             win.blit(resume_text, resume_rect)
         else:
             resume_rect = None
 
         pygame.display.update()
+        if _startup_marks:
+            mark_startup("first menu frame")
+            report_startup()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
@@ -191,34 +311,75 @@ def main_menu():
     return game_mode, selected_difficulty
 
 
-def game_loop(board, difficulty, initial_time=0):
+def save_progress(
+    saver, board, journal, difficulty, time_elapsed, full=False, profiler=NULL_PROFILER
+):
+    """Append the journal's new records to the save, or write a full snapshot
+    if full is set or the journal has grown to SNAPSHOT_INTERVAL records."""
+    profiler.mark("events")
+    if full or journal.tail_length >= SNAPSHOT_INTERVAL:
+        c, n, g = board.get_state()
+        saver.save_game(
+            c, board.solution, g, n, difficulty, time_elapsed, board.auto_notes
+        )
+        journal.snapshot_taken()
+    else:
+        saver.append_journal(journal.take_unsaved())
+    profiler.mark("save")
+
+
+def game_loop(board, difficulty, initial_time=0, saver=None, journal=None):
     """
     The main game loop.
     :param board: Board instance
     :param difficulty: "easy", "medium", or "hard"
     :param initial_time: time elapsed from a previous session
+    :param saver: SaveWorker that writes progress in the background
+    :param journal: Journal of the board's moves (e.g. replayed on resume)
     """
+    if saver is None:
+        saver = SaveWorker()
+    if journal is None:
+        journal = Journal(board)
     win = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
     pygame.display.set_caption("Sedoku Game")
 
     note_mode = False
     clock = pygame.time.Clock()
     message = ""
-    animations = []
+    timeline = Timeline()
+    warm_fade_frames()
 
-    # Track row/col/box animations
-    solved_rows_animated = set()
-    solved_cols_animated = set()
-    solved_boxes_animated = set()
-    # Track digit animations
-    animated_numbers = set()
+    # (kind, index) of every row/col/box/digit already animated
+    animated = set()
 
     # Timer
     time_elapsed = initial_time
     start_ticks = pygame.time.get_ticks()  # in ms
 
+    # Only what changed gets redrawn; start with the whole window.
+    scheduler = RenderScheduler()
+    last_timer_str = None
+
+    profiler = FrameProfiler() if PROFILE else NULL_PROFILER
+
     running = True
     while running:
+        if timeline or scheduler.pending():
+            events = pygame.event.get()
+        else:
+            # Nothing is animating: advance the next hint's search while idle
+            # (each call is bounded, and the result is cached until a move
+            # changes the board), then sleep until input arrives or the timer
+            # reaches the next whole second.
+            board.hint()
+            wait_ms = 1000 - (pygame.time.get_ticks() - start_ticks) % 1000
+            event = pygame.event.wait(wait_ms)
+            events = (
+                [] if event.type == pygame.NOEVENT else [event] + pygame.event.get()
+            )
+        profiler.start_frame()
+
         # Compute total time (saved + new session)
         current_ticks = pygame.time.get_ticks()
         session_seconds = (current_ticks - start_ticks) // 1000
@@ -227,178 +388,209 @@ def game_loop(board, difficulty, initial_time=0):
         minutes = total_time // 60
         seconds = total_time % 60
         timer_str = f"{minutes:02d}:{seconds:02d}"
+        if timer_str != last_timer_str:
+            scheduler.invalidate_header()
+            last_timer_str = timer_str
 
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 # Save on quit
                 final_time = (
                     time_elapsed + (pygame.time.get_ticks() - start_ticks) // 1000
                 )
-                c, n, g = board.get_state()
-                save_game(c, board.solution, g, n, difficulty, final_time)
+                save_progress(saver, board, journal, difficulty, final_time, full=True)
+                saver.close()
+                if profiler.enabled:
+                    profiler.dump()
                 pygame.quit()
                 sys.exit()
 
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                scheduler.invalidate_all()
+
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 pos = pygame.mouse.get_pos()
+                highlighted = board.highlighted_cells()
                 board.click(pos)
+                scheduler.invalidate_cells(highlighted | board.highlighted_cells())
 
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_n:
                     note_mode = not note_mode
+                    scheduler.invalidate_header()
+                elif (
+                    event.key in (pygame.K_z, pygame.K_y)
+                    and event.mod & pygame.KMOD_CTRL
+                ):
+                    # Ctrl+Z undoes; Ctrl+Y or Ctrl+Shift+Z redoes
+                    highlighted = board.highlighted_cells()
+                    if event.key == pygame.K_y or event.mod & pygame.KMOD_SHIFT:
+                        cell = journal.redo(total_time)
+                    else:
+                        cell = journal.undo(total_time)
+                    if cell is not None:
+                        board.selected = cell
+                        scheduler.invalidate_cells(
+                            highlighted | board.highlighted_cells()
+                        )
+                        scheduler.invalidate_cells([cell])
+                        if board.auto_notes:
+                            scheduler.invalidate_cells(board.peers(*cell))
+                        save_progress(
+                            saver,
+                            board,
+                            journal,
+                            difficulty,
+                            total_time,
+                            profiler=profiler,
+                        )
+                elif event.key == pygame.K_F3:
+                    # Show or hide the frame profiler, starting it on first use
+                    if not profiler.enabled:
+                        profiler = FrameProfiler()
+                        profiler.start_frame()
+                    profiler.overlay_visible = not profiler.overlay_visible
+                    scheduler.invalidate_all()
+                elif event.key == pygame.K_a:
+                    journal.set_auto_notes(not board.auto_notes, total_time)
+                    message = (
+                        "Auto notes: ON" if board.auto_notes else "Auto notes: OFF"
+                    )
+                    scheduler.invalidate_all()
+                    save_progress(
+                        saver, board, journal, difficulty, total_time, profiler=profiler
+                    )
+                elif event.key == pygame.K_h:
+                    hint = board.hint()
+                    if hint is not None:
+                        highlighted = board.highlighted_cells()
+                        board.selected = hint.cell
+                        message = f"Hint: {hint.digit} ({hint.technique})"
+                        scheduler.invalidate_cells(
+                            highlighted | board.highlighted_cells()
+                        )
+                        scheduler.invalidate_header()
                 elif board.selected and event.unicode in "123456789":
                     row, col = board.selected
+                    highlighted = board.highlighted_cells()
+                    if message:
+                        message = ""
+                        scheduler.invalidate_header()
                     try:
                         val = int(event.unicode)
-                        board.set_cell_value(row, col, val, note_mode)
+                        journal.play(row, col, val, note_mode, total_time)
                     except ValueError:
                         pass
-                    # Save progress after each valid move
-                    updated_time = (
-                        time_elapsed + (pygame.time.get_ticks() - start_ticks) // 1000
+                    scheduler.invalidate_cells(highlighted | board.highlighted_cells())
+                    scheduler.invalidate_cells([(row, col)])
+                    if board.auto_notes and not note_mode:
+                        scheduler.invalidate_cells(board.peers(row, col))
+                    # Journal each move; a full save is only written now and then
+                    save_progress(
+                        saver, board, journal, difficulty, total_time, profiler=profiler
                     )
-                    c, n, g = board.get_state()
-                    save_game(c, board.solution, g, n, difficulty, updated_time)
 
-        # Check row/col/box completions for animations
-        current_time = pygame.time.get_ticks()
-        for i in range(9):
-            if i not in solved_rows_animated:
-                # if row i is fully correct
-                if all(
-                    board.cells[i][j].value != 0
-                    and board.cells[i][j].value == board.solution[i][j]
-                    for j in range(9)
-                ):
-                    animations.append(
-                        {
-                            "type": "row",
-                            "index": i,
-                            "start_time": current_time,
-                            "duration": ANIM_DURATION,
-                            "x": (
-                                board.BOARD_OFFSET_X
-                                if hasattr(board, "BOARD_OFFSET_X")
-                                else (
-                                    board.offset_x if hasattr(board, "offset_x") else 0
-                                )
-                            ),
-                            # but we'll just use global offsets:
-                            "x": 0 + (BOARD_OFFSET_X),
-                            "y": BOARD_OFFSET_Y + i * CELL_SIZE,
-                            "width": BOARD_SIZE,
-                            "height": CELL_SIZE,
-                        }
-                    )
-                    solved_rows_animated.add(i)
-
-        for j in range(9):
-            if j not in solved_cols_animated:
-                # if column j is fully correct
-                if all(
-                    board.cells[i][j].value != 0
-                    and board.cells[i][j].value == board.solution[i][j]
-                    for i in range(9)
-                ):
-                    animations.append(
-                        {
-                            "type": "col",
-                            "index": j,
-                            "start_time": current_time,
-                            "duration": ANIM_DURATION,
-                            "x": BOARD_OFFSET_X + j * CELL_SIZE,
-                            "y": BOARD_OFFSET_Y,
-                            "width": CELL_SIZE,
-                            "height": BOARD_SIZE,
-                        }
-                    )
-                    solved_cols_animated.add(j)
-
-        for box_row in range(3):
-            for box_col in range(3):
-                if (box_row, box_col) not in solved_boxes_animated:
-                    # check if that 3x3 is correct
-                    correct_box = True
-                    for r in range(box_row * 3, box_row * 3 + 3):
-                        for c in range(box_col * 3, box_col * 3 + 3):
-                            if (
-                                board.cells[r][c].value == 0
-                                or board.cells[r][c].value != board.solution[r][c]
-                            ):
-                                correct_box = False
-                                break
-                        if not correct_box:
-                            break
-                    if correct_box:
-                        animations.append(
-                            {
-                                "type": "box",
-                                "index": (box_row, box_col),
-                                "start_time": current_time,
-                                "duration": ANIM_DURATION,
-                                "x": BOARD_OFFSET_X + box_col * 3 * CELL_SIZE,
-                                "y": BOARD_OFFSET_Y + box_row * 3 * CELL_SIZE,
-                                "width": 3 * CELL_SIZE,
-                                "height": 3 * CELL_SIZE,
-                            }
-                        )
-                        solved_boxes_animated.add((box_row, box_col))
+        profiler.mark("events")
 
-        # Check for number-based animations
-        new_events = check_number_animation(board, animated_numbers, current_time)
-        animations.extend(new_events)
+        # Completion events come from the board's counters, so nothing is
+        # scanned unless a move finished a row, column, box or digit.
+        current_time = pygame.time.get_ticks()
+        for kind, index in board.pop_completions():
+            if (kind, index) in animated:
+                continue
+            animated.add((kind, index))
+            if kind == "number":
+                timeline.extend(number_animation_events(board, index, current_time))
+            else:
+                timeline.add(unit_animation_event(kind, index, current_time))
+        profiler.mark("completions")
 
         # Check if entire puzzle is solved
         if board.is_solved():
+            if profiler.enabled:
+                profiler.dump()
             final_time = time_elapsed + (pygame.time.get_ticks() - start_ticks) // 1000
             redraw_window(
                 win,
                 board,
                 note_mode,
                 "Puzzle Solved!",
-                animations,
+                timeline,
                 f"{final_time//60:02d}:{final_time%60:02d}",
             )
             pygame.time.delay(2000)
-            clear_save()
+            saver.clear_save()
             running = False
             continue
 
-        # Draw everything
-        redraw_window(win, board, note_mode, message, animations, timer_str)
+        # Draw whatever changed
+        redraw_dirty(
+            win, board, note_mode, message, timeline, timer_str, scheduler, profiler
+        )
+        profiler.end_frame()
         clock.tick(30)
 
 
 def main():
-    while True:
-        game_mode, difficulty = main_menu()
-        if game_mode == "resume":
-            data = load_game()
-            if data is None:
-                # If no valid save, fallback to new easy
-                game_mode, difficulty = "new", "easy"
-                data = None
-            if data is not None:
-                # Resume
-                board_instance = Board.from_save(data)
-                difficulty = data.get("difficulty", "easy")
-                time_elapsed = data.get("time_elapsed", 0)
-                game_loop(board_instance, difficulty, time_elapsed)
-                continue
-        # Else new game
-        full_board = generate_full_board()
-        if difficulty == "easy":
-            removals = 30
-        elif difficulty == "medium":
-            removals = 40
-        else:
-            removals = 50
-        puzzle_board = remove_numbers(full_board, removals)
-        board_instance = Board(puzzle_board, full_board)
-        # Immediately save (time_elapsed=0)
-        c, n, g = board_instance.get_state()
-        save_game(c, board_instance.solution, g, n, difficulty, 0)
-        game_loop(board_instance, difficulty, 0)
+    mark_startup("imports")
+    bank = open_bank()
+    # Without a bank, puzzles are generated ahead in a background process,
+    # forked here before pygame or the save thread start any threads.
+    prefetcher = PuzzlePrefetcher() if bank is None else None
+    mark_startup("bank and prefetch")
+    init_pygame()
+    mark_startup("pygame init")
+    saver = SaveWorker()
+    mark_startup("save worker")
+    try:
+        while True:
+            # Let the last game's save or clear land before the menu checks for it
+            saver.flush()
+            game_mode, difficulty = main_menu()
+            if game_mode == "resume":
+                data = load_game()
+                if data is None:
+                    # If no valid save, fallback to new easy
+                    game_mode, difficulty = "new", "easy"
+                    data = None
+                if data is not None:
+                    # Resume
+                    board_instance = Board.from_save(data)
+                    difficulty = data.get("difficulty", "easy")
+                    # Moves made after the last full save are replayed on top of it
+                    journal = Journal(board_instance)
+                    last_move_time = journal.replay(data.get("journal", b""))
+                    time_elapsed = max(data.get("time_elapsed", 0), last_move_time)
+                    game_loop(board_instance, difficulty, time_elapsed, saver, journal)
+                    continue
+            # Else new game: draw from the pre-generated bank if there is one
+            drawn = bank.draw(difficulty) if bank else None
+            if drawn is not None:
+                # A random symmetry makes repeat draws from a small bank look new
+                transform = random_transform()
+                puzzle_board, full_board = (
+                    transform.apply_board(grid) for grid in drawn
+                )
+            else:
+                # Otherwise take one the prefetcher finished during play or the menus
+                drawn = prefetcher.take(difficulty) if prefetcher else None
+                if drawn is not None:
+                    puzzle_board, full_board = drawn
+                else:
+                    full_board = generate_full_board()
+                    removals = DIFFICULTY_REMOVALS.get(
+                        difficulty, DIFFICULTY_REMOVALS["hard"]
+                    )
+                    puzzle_board = remove_numbers(full_board, removals)
+            board_instance = Board(puzzle_board, full_board)
+            # Immediately save (time_elapsed=0)
+            c, n, g = board_instance.get_state()
+            saver.save_game(c, board_instance.solution, g, n, difficulty, 0)
+            game_loop(board_instance, difficulty, 0, saver)
+    finally:
+        # sys.exit() on a quit path lands here too; drop puzzles not yet started
+        if prefetcher:
+            prefetcher.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,86 @@
+"""
+Puzzles generated ahead of time in a background process, so starting a new
+game takes a finished puzzle instead of waiting on the generator.
+
+    prefetcher = PuzzlePrefetcher()  # before pygame.init() and any thread
+    drawn = prefetcher.take("hard")  # (puzzle, solution), or None
+    prefetcher.close()
+
+On Linux the worker process is forked from the caller, and a fork copies
+only the calling thread. A worker forked after pygame or the save thread
+started could inherit a lock some other thread held and hang, so the game
+creates the prefetcher first thing in main.py (only when there is no
+puzzle bank) and closes it on every way out.
+"""
+
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from generator import DIFFICULTY_REMOVALS, generate_puzzle
+
+DEPTH = 2  # puzzles kept ready (or in progress) per difficulty
+NICENESS = 10  # the worker's scheduling priority drop, so rendering comes first
+
+
+def _init_worker():
+    # A forked worker starts with the game's random state; give it its own.
+    random.seed()
+    try:
+        os.nice(NICENESS)
+    except (AttributeError, OSError):
+        pass
+
+
+class PuzzlePrefetcher:
+    """
+    Generates puzzles ahead of time in one low-priority worker process, so a
+    new game takes a finished puzzle instead of waiting on the generator.
+
+    Each difficulty keeps DEPTH futures queued; take() hands out the oldest
+    and queues a replacement. Being a separate process, generation never
+    holds the game's GIL, and its lowered priority lets the render loop win
+    whenever both want the CPU.
+    """
+
+    def __init__(self, difficulties=tuple(DIFFICULTY_REMOVALS), depth=DEPTH):
+        self.depth = depth
+        self._pool = ProcessPoolExecutor(max_workers=1, initializer=_init_worker)
+        self._queues = {difficulty: deque() for difficulty in difficulties}
+        # Interleave difficulties so one of each is ready first
+        for _ in range(depth):
+            for difficulty in self._queues:
+                self._submit(difficulty)
+
+    def _submit(self, difficulty):
+        self._queues[difficulty].append(self._pool.submit(generate_puzzle, difficulty))
+
+    def ready(self, difficulty):
+        """Number of finished puzzles waiting for a difficulty."""
+        return sum(future.done() for future in self._queues.get(difficulty, ()))
+
+    def take(self, difficulty):
+        """
+        Return a (puzzle, solution) for a difficulty and queue the next one.
+        If none has finished yet this waits for the one furthest along, which
+        is never slower than generating from scratch. Returns None if the
+        difficulty is unknown or the worker has failed.
+        """
+        queue = self._queues.get(difficulty)
+        if not queue:
+            return None
+        future = queue.popleft()
+        try:
+            result = future.result()
+        except Exception:
+            return None
+        try:
+            self._submit(difficulty)
+        except RuntimeError:  # shut down, or the worker died
+            pass
+        return result
+
+    def close(self):
+        """Stop the worker, dropping puzzles that have not started."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,159 @@
+import json
+import time
+from bisect import bisect_left
+from collections import deque
+
+import pygame
+
+from fonts import LazyFont
+
+# Phases of one game_loop iteration, in the order they run. Time spent
+# waiting for input or for the frame clock is not counted.
+PHASES = ("events", "save", "completions", "draw", "animations", "display")
+
+WINDOW = 600  # frames kept for the rolling percentiles (20 s at 30 fps)
+PERCENTILES = (50, 95, 99)
+# Upper edges (ms) of the frame-time histogram buckets; the last bucket is open.
+HISTOGRAM_MS = (1, 2, 4, 8, 16, 33, 66, 100)
+
+PROFILE_FILE = "profile.json"
+
+FONT_OVERLAY = LazyFont("sans", 14)
+OVERLAY_POS = (6, 104)
+OVERLAY_COLUMNS = (92, 48)  # label column and value column widths
+OVERLAY_BG = (20, 20, 30)
+OVERLAY_TEXT = (230, 230, 230)
+OVERLAY_BAR = (90, 170, 250)
+
+
+class NullProfiler:
+    """Stands in for FrameProfiler when profiling is off; every call is a no-op."""
+
+    enabled = False
+    overlay_visible = False
+
+    def start_frame(self):
+        pass
+
+    def mark(self, phase):
+        pass
+
+    def end_frame(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class FrameProfiler:
+    """
+    Times the phases of every game_loop iteration.
+
+    start_frame() begins a frame and each mark(phase) charges the time since
+    the previous call to that phase, so a phase can be marked several times
+    per frame. end_frame() adds the frame to rolling per-phase samples (for
+    percentiles) and to a histogram of whole-frame times.
+    """
+
+    enabled = True
+
+    def __init__(self, window=WINDOW):
+        self.samples = {phase: deque(maxlen=window) for phase in PHASES + ("frame",)}
+        self.histogram = [0] * (len(HISTOGRAM_MS) + 1)
+        self.frames = 0
+        self.overlay_visible = False
+        self._current = dict.fromkeys(PHASES, 0.0)
+        self._last = 0.0
+
+    def start_frame(self):
+        for phase in PHASES:
+            self._current[phase] = 0.0
+        self._last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self._current[phase] += now - self._last
+        self._last = now
+
+    def end_frame(self):
+        total = 0.0
+        for phase, seconds in self._current.items():
+            self.samples[phase].append(seconds)
+            total += seconds
+        self.samples["frame"].append(total)
+        self.histogram[bisect_left(HISTOGRAM_MS, total * 1000)] += 1
+        self.frames += 1
+
+    def percentiles(self, phase):
+        """{percentile: milliseconds} over the rolling window for one phase
+        (or "frame")."""
+        ordered = sorted(self.samples[phase])
+        if not ordered:
+            return {p: 0.0 for p in PERCENTILES}
+        last = len(ordered) - 1
+        return {p: ordered[round(last * p / 100)] * 1000 for p in PERCENTILES}
+
+    def summary(self):
+        """Percentiles per phase and the frame-time histogram, as plain data."""
+        edges = [f"<={ms}ms" for ms in HISTOGRAM_MS] + [f">{HISTOGRAM_MS[-1]}ms"]
+        return {
+            "frames": self.frames,
+            "window": self.samples["frame"].maxlen,
+            "percentiles_ms": {
+                phase: {
+                    f"p{p}": round(ms, 3) for p, ms in self.percentiles(phase).items()
+                }
+                for phase in self.samples
+            },
+            "frame_histogram": dict(zip(edges, self.histogram)),
+        }
+
+    def dump(self, path=PROFILE_FILE):
+        """Write summary() as JSON."""
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def draw_overlay(self, win):
+        """Draw the percentiles and histogram in a panel; returns the panel's rect."""
+        font = FONT_OVERLAY.get()
+        line_height = font.get_linesize()
+        label_width, value_width = OVERLAY_COLUMNS
+        width = label_width + value_width * len(PERCENTILES) + 12
+        rows = 1 + len(PHASES) + 1 + 2 + len(self.histogram)
+        rect = pygame.Rect(OVERLAY_POS, (width, line_height * rows + 12))
+        win.fill(OVERLAY_BG, rect)
+        left = rect.left + 6
+        y = rect.top + 6
+
+        def text(value, x, right=False):
+            surf = font.render(value, True, OVERLAY_TEXT)
+            win.blit(surf, (x - surf.get_width() if right else x, y))
+
+        # Percentile table, one row per phase plus the whole frame
+        text("ms", left)
+        for k, p in enumerate(PERCENTILES, 1):
+            text(f"p{p}", left + label_width + k * value_width, right=True)
+        for phase in PHASES + ("frame",):
+            y += line_height
+            text(phase, left)
+            for k, ms in enumerate(self.percentiles(phase).values(), 1):
+                text(f"{ms:.2f}", left + label_width + k * value_width, right=True)
+
+        # Frame-time histogram since profiling started
+        y += line_height * 2
+        text(f"{self.frames} frames", left)
+        peak = max(self.histogram) or 1
+        bar_width = width - label_width - 18
+        labels = [f"<={ms}ms" for ms in HISTOGRAM_MS] + [f">{HISTOGRAM_MS[-1]}ms"]
+        for label, count in zip(labels, self.histogram):
+            y += line_height
+            text(label, left + label_width - 6, right=True)
+            if count:
+                bar = (
+                    left + label_width,
+                    y + 2,
+                    max(1, bar_width * count // peak),
+                    line_height - 4,
+                )
+                win.fill(OVERLAY_BAR, bar)
+        return rect
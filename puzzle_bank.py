@@ -0,0 +1,201 @@
+"""
+Pre-generated puzzle bank stored in a compact binary file and read via mmap.
+
+    python3 batch.py -n 100000 -o puzzles.txt
+    python3 puzzle_bank.py build puzzles.txt -o puzzles.bank
+    python3 puzzle_bank.py info puzzles.bank
+
+Layout (little-endian):
+    header   magic "SDKB", u16 version, u16 number of difficulty levels
+    index    one (u64 first record, u64 record count) pair per level
+    records  fixed 83-byte records grouped by level: 41 bytes of packed
+             puzzle digits, 41 bytes of packed solution digits, 1 level byte
+
+Digits are packed two per byte (high nibble first), so a random draw is a
+single slice of the mapped file and never loads the rest of the bank.
+"""
+
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+
+from generator import DIFFICULTY_REMOVALS
+from solver import parse_puzzle
+
+BANK_FILE = "puzzles.bank"
+
+MAGIC = b"SDKB"
+VERSION = 1
+LEVELS = tuple(DIFFICULTY_REMOVALS)  # level byte -> difficulty name
+
+HEADER = struct.Struct("<4sHH")
+INDEX_ENTRY = struct.Struct("<QQ")
+GRID_BYTES = 41
+RECORD_SIZE = 2 * GRID_BYTES + 1
+
+
+def pack_grid(board):
+    """Pack a 9x9 board into 41 bytes, two digits per byte."""
+    digits = [v for row in board for v in row] + [0]
+    return bytes((digits[k] << 4) | digits[k + 1] for k in range(0, 82, 2))
+
+
+def unpack_grid(data):
+    """Unpack 41 bytes of packed digits into a 9x9 board."""
+    digits = []
+    for byte in data:
+        digits.append(byte >> 4)
+        digits.append(byte & 0x0F)
+    return [digits[r * 9 : r * 9 + 9] for r in range(9)]
+
+
+def pack_record(puzzle, solution, level):
+    """Build one fixed-width bank record."""
+    return pack_grid(puzzle) + pack_grid(solution) + bytes((level,))
+
+
+def _parse_line(line):
+    """Parse a batch.py output line into (level, puzzle, solution)."""
+    difficulty, puzzle, solution = line.split()
+    return LEVELS.index(difficulty), parse_puzzle(puzzle), parse_puzzle(solution)
+
+
+def build_bank(lines, path=BANK_FILE):
+    """
+    Write a bank file from batch.py output lines. Records are spooled to one
+    temporary file per level, so memory use does not grow with the input.
+    Returns the number of records written per difficulty.
+    """
+    spools = [tempfile.TemporaryFile() for _ in LEVELS]
+    counts = [0] * len(LEVELS)
+    try:
+        for line in lines:
+            if not line.strip():
+                continue
+            level, puzzle, solution = _parse_line(line)
+            spools[level].write(pack_record(puzzle, solution, level))
+            counts[level] += 1
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(LEVELS)))
+            first = 0
+            for count in counts:
+                f.write(INDEX_ENTRY.pack(first, count))
+                first += count
+            for spool in spools:
+                spool.seek(0)
+                while True:
+                    block = spool.read(RECORD_SIZE * 4096)
+                    if not block:
+                        break
+                    f.write(block)
+        os.replace(tmp_path, path)
+    finally:
+        for spool in spools:
+            spool.close()
+    return dict(zip(LEVELS, counts))
+
+
+class PuzzleBank:
+    """Read-only view of a bank file. Records are read straight from the mmap."""
+
+    def __init__(self, path=BANK_FILE):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is empty")
+
+        magic, version, levels = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} puzzle bank")
+
+        self._index = {}
+        offset = HEADER.size
+        for level in range(levels):
+            first, count = INDEX_ENTRY.unpack_from(self._map, offset)
+            offset += INDEX_ENTRY.size
+            if level < len(LEVELS):
+                self._index[LEVELS[level]] = (first, count)
+        self._records_start = offset
+
+        total = sum(count for _, count in self._index.values())
+        if len(self._map) < self._records_start + total * RECORD_SIZE:
+            self.close()
+            raise ValueError(f"{path} is truncated")
+
+    def count(self, difficulty):
+        """Number of puzzles stored for a difficulty."""
+        return self._index.get(difficulty, (0, 0))[1]
+
+    def get(self, difficulty, index):
+        """Return (puzzle, solution) for the index-th puzzle of a difficulty."""
+        first, count = self._index[difficulty]
+        if not 0 <= index < count:
+            raise IndexError(index)
+        start = self._records_start + (first + index) * RECORD_SIZE
+        record = self._map[start : start + RECORD_SIZE]
+        return unpack_grid(record[:GRID_BYTES]), unpack_grid(record[GRID_BYTES:-1])
+
+    def draw(self, difficulty, rng=random):
+        """Return a random (puzzle, solution) for a difficulty, or None if there
+        are none."""
+        count = self.count(difficulty)
+        if count == 0:
+            return None
+        return self.get(difficulty, rng.randrange(count))
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_bank(path=BANK_FILE):
+    """Open the puzzle bank, or return None if it is missing/invalid."""
+    if not os.path.exists(path):
+        return None
+    try:
+        return PuzzleBank(path)
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect a puzzle bank.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="build a bank from batch.py output")
+    build.add_argument("input", help="batch.py output file ('-' for stdin)")
+    build.add_argument("-o", "--output", default=BANK_FILE)
+    info = sub.add_parser("info", help="show how many puzzles a bank holds")
+    info.add_argument("bank", nargs="?", default=BANK_FILE)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        src = sys.stdin if args.input == "-" else open(args.input)
+        try:
+            counts = build_bank(src, args.output)
+        finally:
+            if src is not sys.stdin:
+                src.close()
+    else:
+        with PuzzleBank(args.bank) as bank:
+            counts = {level: bank.count(level) for level in LEVELS}
+    for level, count in counts.items():
+        print(f"{level:<8}{count:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import pygame
+from board import BOARD_OFFSET_X, BOARD_OFFSET_Y, CELL_SIZE, WINDOW_WIDTH
+
+HEADER_HEIGHT = 80
+HEADER_RECT = pygame.Rect(0, 0, WINDOW_WIDTH, HEADER_HEIGHT)
+
+
+class RenderScheduler:
+    """
+    Collects what changed since the last frame so the game loop can redraw
+    and push only those parts of the window.
+
+    Changes are tracked as a full-window flag, a header flag and a set of
+    (row, col) board cells; rects() turns them into screen rectangles for
+    pygame.display.update().
+    """
+
+    def __init__(self):
+        self.full = True
+        self.header = False
+        self.cells = set()
+
+    def invalidate_all(self):
+        self.full = True
+
+    def invalidate_header(self):
+        self.header = True
+
+    def invalidate_cells(self, cells):
+        self.cells.update(cells)
+
+    def invalidate_rect(self, rect):
+        """Mark every board cell overlapping a screen rectangle (e.g. an animation)."""
+        rect = pygame.Rect(rect)
+        if rect.colliderect(HEADER_RECT):
+            self.header = True
+        first_col = max(0, (rect.left - BOARD_OFFSET_X) // CELL_SIZE)
+        last_col = min(8, (rect.right - 1 - BOARD_OFFSET_X) // CELL_SIZE)
+        first_row = max(0, (rect.top - BOARD_OFFSET_Y) // CELL_SIZE)
+        last_row = min(8, (rect.bottom - 1 - BOARD_OFFSET_Y) // CELL_SIZE)
+        for r in range(first_row, last_row + 1):
+            for c in range(first_col, last_col + 1):
+                self.cells.add((r, c))
+
+    def pending(self):
+        """True if anything needs to be redrawn."""
+        return self.full or self.header or bool(self.cells)
+
+    def rects(self):
+        """Screen rectangles covering everything marked as changed."""
+        rects = [HEADER_RECT] if self.header else []
+        rects.extend(
+            pygame.Rect(
+                BOARD_OFFSET_X + c * CELL_SIZE,
+                BOARD_OFFSET_Y + r * CELL_SIZE,
+                CELL_SIZE,
+                CELL_SIZE,
+            )
+            for r, c in self.cells
+        )
+        return rects
+
+    def clear(self):
+        self.full = False
+        self.header = False
+        self.cells.clear()
@@ -0,0 +1,63 @@
+import pygame
+
+
+class RenderCache:
+    """
+    Pre-rendered surfaces shared by every draw call.
+
+    - text(): font glyphs/strings rendered once per (font, text, color).
+    - overlay(): solid or semi-transparent fills allocated once per (size, color).
+    - layer(): larger static surfaces (background, grid lines) built once by a
+      callback and reused until invalidated.
+
+    Everything is dropped when validate() sees a new window size or theme.
+    """
+
+    def __init__(self):
+        self._text = {}
+        self._overlays = {}
+        self._layers = {}
+        self._key = None
+
+    def validate(self, size, theme):
+        """Drop all cached surfaces if the window size or theme changed."""
+        key = (tuple(size), theme)
+        if key != self._key:
+            self.invalidate()
+            self._key = key
+
+    def invalidate(self):
+        self._text.clear()
+        self._overlays.clear()
+        self._layers.clear()
+
+    def text(self, font, text, color):
+        """Antialiased rendering of text, cached."""
+        key = (font, text, color)
+        surf = self._text.get(key)
+        if surf is None:
+            surf = self._text[key] = font.render(text, True, color)
+        return surf
+
+    def overlay(self, size, color):
+        """A surface of the given size filled with an RGB or RGBA color, cached."""
+        key = (tuple(size), color)
+        surf = self._overlays.get(key)
+        if surf is None:
+            if len(color) == 4:
+                surf = pygame.Surface(size, pygame.SRCALPHA)
+            else:
+                surf = pygame.Surface(size)
+            surf.fill(color)
+            self._overlays[key] = surf
+        return surf
+
+    def layer(self, name, build):
+        """A named static surface, built by build() on first use."""
+        surf = self._layers.get(name)
+        if surf is None:
+            surf = self._layers[name] = build()
+        return surf
+
+
+CACHE = RenderCache()
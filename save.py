@@ -1,36 +1,352 @@
 import json
 import os
+import struct
+import sys
+import threading
+import zlib
 
-SAVE_FILE = "save.txt"
+from generator import DIFFICULTY_REMOVALS
+from puzzle_bank import GRID_BYTES, pack_grid, unpack_grid
 
+SAVE_FILE = "save.bin"
+LEGACY_SAVE_FILE = "save.txt"  # JSON saves from older versions
+JOURNAL_FILE = "save.journal"  # moves made since SAVE_FILE was written
 
-def save_game(current_board, solution_board, givens, notes, difficulty, time_elapsed):
-    """Save the current puzzle state to a file."""
-    data = {
+# Seconds a background save waits for further moves before writing, so a
+# burst of key presses ends up as a single write.
+COALESCE_DELAY = 0.25
+
+# Binary save layout (little-endian):
+#   header   magic "SDKS", u16 version, u8 difficulty, u8 flags (bit 0:
+#            auto-notes on), u32 time elapsed, u32 CRC-32 of the payload
+#   payload  current digits (41 bytes, two per byte), solution digits
+#            (41 bytes), givens as an 81-bit mask (11 bytes), notes as one
+#            9-bit mask per cell (92 bytes)
+MAGIC = b"SDKS"
+VERSION = 1
+HEADER = struct.Struct("<4sHBBII")
+FLAG_AUTO_NOTES = 1
+DIFFICULTIES = tuple(DIFFICULTY_REMOVALS)
+GIVENS_BYTES = 11
+NOTES_BYTES = 92
+PAYLOAD_SIZE = 2 * GRID_BYTES + GIVENS_BYTES + NOTES_BYTES
+
+# The journal is a header naming the snapshot it follows (by the CRC-32 of
+# that save's payload), then journal.RECORD entries appended as moves are
+# made. A journal whose header does not match the save is ignored.
+JOURNAL_MAGIC = b"SDKJ"
+JOURNAL_HEADER = struct.Struct("<4sHI")
+
+
+def _game_data(
+    current_board,
+    solution_board,
+    givens,
+    notes,
+    difficulty,
+    time_elapsed,
+    auto_notes=False,
+    journal=b"",
+):
+    return {
         "current": current_board,
         "notes": notes,
         "solution": solution_board,
         "givens": givens,
         "difficulty": difficulty,
         "time_elapsed": time_elapsed,
+        "auto_notes": auto_notes,
+        "journal": journal,
     }
-    with open(SAVE_FILE, "w") as f:
-        json.dump(data, f)
 
 
-def load_game():
-    """Load puzzle state from file, or return None if not found/invalid."""
-    if not os.path.exists(SAVE_FILE):
-        return None
-    with open(SAVE_FILE, "r") as f:
+def encode_save(data):
+    """Pack game data (as returned by load_game) into the binary save format."""
+    given_mask = 0
+    note_masks = 0
+    for i in range(81):
+        r, c = divmod(i, 9)
+        if data["givens"][r][c]:
+            given_mask |= 1 << i
+        for note in data["notes"][r][c]:
+            note_masks |= 1 << (i * 9 + note - 1)
+    payload = (
+        pack_grid(data["current"])
+        + pack_grid(data["solution"])
+        + given_mask.to_bytes(GIVENS_BYTES, "little")
+        + note_masks.to_bytes(NOTES_BYTES, "little")
+    )
+    difficulty = data["difficulty"]
+    code = DIFFICULTIES.index(difficulty) if difficulty in DIFFICULTIES else 0
+    flags = FLAG_AUTO_NOTES if data.get("auto_notes") else 0
+    header = HEADER.pack(
+        MAGIC, VERSION, code, flags, int(data["time_elapsed"]), zlib.crc32(payload)
+    )
+    return header + payload
+
+
+def decode_save(blob):
+    """Unpack a binary save into game data. Raises ValueError if it is invalid."""
+    if len(blob) != HEADER.size + PAYLOAD_SIZE:
+        raise ValueError("save has the wrong size")
+    magic, version, code, flags, time_elapsed, checksum = HEADER.unpack_from(blob)
+    payload = blob[HEADER.size :]
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a version %d save" % VERSION)
+    if zlib.crc32(payload) != checksum:
+        raise ValueError("save checksum mismatch")
+
+    pos = 0
+    current = unpack_grid(payload[pos : pos + GRID_BYTES])
+    pos += GRID_BYTES
+    solution = unpack_grid(payload[pos : pos + GRID_BYTES])
+    pos += GRID_BYTES
+    given_mask = int.from_bytes(payload[pos : pos + GIVENS_BYTES], "little")
+    pos += GIVENS_BYTES
+    note_masks = int.from_bytes(payload[pos:], "little")
+
+    givens = [[given_mask >> (r * 9 + c) & 1 for c in range(9)] for r in range(9)]
+    notes = [
+        [
+            [d + 1 for d in range(9) if note_masks >> ((r * 9 + c) * 9 + d) & 1]
+            for c in range(9)
+        ]
+        for r in range(9)
+    ]
+    difficulty = DIFFICULTIES[code] if code < len(DIFFICULTIES) else DIFFICULTIES[0]
+    return _game_data(
+        current,
+        solution,
+        givens,
+        notes,
+        difficulty,
+        time_elapsed,
+        auto_notes=bool(flags & FLAG_AUTO_NOTES),
+    )
+
+
+def _write_atomic(path, blob):
+    """Write bytes to a temporary file and rename it over path, so a crash
+    mid-write leaves the previous save intact."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _journal_header(snapshot):
+    return JOURNAL_HEADER.pack(
+        JOURNAL_MAGIC, VERSION, zlib.crc32(snapshot[HEADER.size :])
+    )
+
+
+def _write_snapshot(blob):
+    """Write a full save and start an empty journal after it."""
+    _write_atomic(SAVE_FILE, blob)
+    _write_atomic(JOURNAL_FILE, _journal_header(blob))
+
+
+def _append_journal(records):
+    with open(JOURNAL_FILE, "ab") as f:
+        f.write(records)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _read_journal(snapshot):
+    """The journal records written after a save, or b"" if there are none."""
+    try:
+        with open(JOURNAL_FILE, "rb") as f:
+            blob = f.read()
+    except OSError:
+        return b""
+    if blob[: JOURNAL_HEADER.size] != _journal_header(snapshot):
+        return b""
+    return blob[JOURNAL_HEADER.size :]
+
+
+def save_game(
+    current_board,
+    solution_board,
+    givens,
+    notes,
+    difficulty,
+    time_elapsed,
+    auto_notes=False,
+):
+    """Save the current puzzle state to a file."""
+    data = _game_data(
+        current_board,
+        solution_board,
+        givens,
+        notes,
+        difficulty,
+        time_elapsed,
+        auto_notes,
+    )
+    _write_snapshot(encode_save(data))
+
+
+def _load_legacy():
+    """Load a JSON save from an older version and convert it to the binary format."""
+    with open(LEGACY_SAVE_FILE, "r") as f:
         try:
             data = json.load(f)
-            return data
         except json.JSONDecodeError:
             return None
+    try:
+        _write_snapshot(encode_save(data))
+        os.remove(LEGACY_SAVE_FILE)
+    except (OSError, KeyError, ValueError, TypeError, IndexError):
+        pass
+    return data
 
 
-def clear_save():
-    """Delete the save file."""
+def load_game():
+    """
+    Load puzzle state from file, or return None if not found/invalid. The
+    "journal" entry holds the move records made after the state was saved,
+    for journal.Journal.replay().
+    """
     if os.path.exists(SAVE_FILE):
-        os.remove(SAVE_FILE)
+        with open(SAVE_FILE, "rb") as f:
+            blob = f.read()
+        try:
+            data = decode_save(blob)
+        except ValueError:
+            return None
+        data["journal"] = _read_journal(blob)
+        return data
+    if os.path.exists(LEGACY_SAVE_FILE):
+        return _load_legacy()
+    return None
+
+
+def clear_save():
+    """Delete the save file, its journal and any legacy JSON save."""
+    for path in (SAVE_FILE, JOURNAL_FILE, LEGACY_SAVE_FILE):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class SaveWorker:
+    """
+    Writes saves on a background thread so the game loop never waits on disk.
+
+    Full saves (snapshots) coalesce: a save or clear replaces whatever is
+    still pending, and the worker waits COALESCE_DELAY seconds after the
+    first request so a burst of moves becomes one write. Journal records are
+    appended in the order they were queued, after any snapshot queued before
+    them; a newer snapshot drops the records it already covers. State is
+    serialized on the calling thread, so later changes to the board cannot
+    leak into a queued save.
+    """
+
+    def __init__(self, delay=COALESCE_DELAY):
+        self.delay = delay
+        self._cond = threading.Condition()
+        self._pending = None  # ("write", bytes) or ("clear", None)
+        self._records = bytearray()  # journal records to append after _pending
+        self._busy = False
+        self._hurry = False
+        self._closing = False
+        self._thread = threading.Thread(
+            target=self._run, name="save-worker", daemon=True
+        )
+        self._thread.start()
+
+    def save_game(
+        self,
+        current_board,
+        solution_board,
+        givens,
+        notes,
+        difficulty,
+        time_elapsed,
+        auto_notes=False,
+    ):
+        """Queue a full save of the current puzzle state, which also restarts the
+        journal."""
+        data = _game_data(
+            current_board,
+            solution_board,
+            givens,
+            notes,
+            difficulty,
+            time_elapsed,
+            auto_notes,
+        )
+        self._submit(("write", encode_save(data)))
+
+    def append_journal(self, records):
+        """Queue journal records for the last saved state."""
+        if not records:
+            return
+        with self._cond:
+            self._records += records
+            self._cond.notify_all()
+
+    def clear_save(self):
+        """Queue deletion of the save file, dropping any pending save."""
+        self._submit(("clear", None))
+
+    def flush(self):
+        """Block until every queued request has reached the disk."""
+        with self._cond:
+            self._hurry = True
+            self._cond.notify_all()
+            while self._pending is not None or self._records or self._busy:
+                self._cond.wait()
+            self._hurry = False
+
+    def close(self):
+        """Flush pending work and stop the worker thread."""
+        self.flush()
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _submit(self, job):
+        with self._cond:
+            self._pending = job
+            self._records.clear()
+            self._cond.notify_all()
+
+    def _has_work(self):
+        return self._pending is not None or bool(self._records)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._has_work() and not self._closing:
+                    self._cond.wait()
+                if not self._has_work():
+                    return
+                # Let a burst of moves settle; newer requests replace the pending one.
+                if not self._hurry and not self._closing:
+                    self._cond.wait_for(
+                        lambda: self._hurry or self._closing, self.delay
+                    )
+                job = self._pending
+                records = bytes(self._records)
+                self._pending = None
+                self._records.clear()
+                self._busy = True
+            try:
+                if job is not None:
+                    action, blob = job
+                    if action == "write":
+                        _write_snapshot(blob)
+                    else:
+                        clear_save()
+                if records and os.path.exists(SAVE_FILE):
+                    _append_journal(records)
+            except OSError as e:
+                print(f"Could not update {SAVE_FILE}: {e}", file=sys.stderr)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
@@ -0,0 +1,427 @@
+"""
+Local HTTP/JSON service for solving, generating and validating puzzles.
+
+    python3 service.py --port 8081 --workers 4
+    curl 'localhost:8081/generate?difficulty=hard'
+    curl -d '{"puzzle": "530070000600195000..."}' localhost:8081/solve
+    curl -d '{"grid": "534678912672195348..."}' localhost:8081/validate
+
+Endpoints (grids are 81-character strings, '0' or '.' for empty cells):
+
+    GET  /generate?difficulty=easy|medium|hard -> {"difficulty", "puzzle", "solution"}
+    POST /solve     {"puzzle": grid}           -> {"solution": grid or null}
+    POST /validate  {"grid": grid}             -> {"valid", "complete", "solutions"}
+    GET  /stats                                -> request, batch and queue counters
+
+"solutions" is 0, 1 or 2 (meaning two or more). Any request can take a
+?timeout=<seconds> query parameter.
+
+Requests are parsed on the event loop and queued per endpoint. Whenever a
+worker process is free, everything queued for an endpoint (up to a batch
+limit) goes to it as one task, so under load many small requests share one
+round trip to the pool while a lone request is sent at once. A full queue
+answers 503 with Retry-After, and a request not answered within its timeout
+gets 504. If a worker process dies, the requests of its batch get 503 and
+the pool is replaced. Connections are kept alive between requests.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from functools import partial
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from generator import DIFFICULTY_REMOVALS, generate_puzzle
+from solver import build_masks, format_puzzle, search, solve, unflatten
+
+HOST = "127.0.0.1"
+PORT = 8081
+
+# Most items of each kind sent to a worker in one task. Generating takes
+# milliseconds, solving and validating usually well under one.
+BATCH_LIMITS = {"solve": 64, "validate": 64, "generate": 8}
+MAX_PENDING = 1024  # queued requests per endpoint before answering 503
+REQUEST_TIMEOUT = 10.0  # seconds, unless the request asks for less
+MAX_TIMEOUT = 60.0
+MAX_BODY = 64 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+# --------------------------------------------------------------------------------
+# Worker side: runs in the pool processes
+# --------------------------------------------------------------------------------
+def _solve(grid):
+    solution = solve(unflatten(grid))
+    return {"solution": format_puzzle(solution) if solution else None}
+
+
+def _validate(grid):
+    masks = build_masks(grid)
+    if masks is None:
+        return {"valid": False, "complete": False, "solutions": 0}
+    return {
+        "valid": True,
+        "complete": 0 not in grid,
+        "solutions": search(list(grid), *masks, limit=2),
+    }
+
+
+def _generate(difficulty):
+    puzzle, solution = generate_puzzle(difficulty)
+    return {
+        "difficulty": difficulty,
+        "puzzle": format_puzzle(puzzle),
+        "solution": format_puzzle(solution),
+    }
+
+
+WORKERS = {"solve": _solve, "validate": _validate, "generate": _generate}
+
+
+def run_batch(kind, items):
+    """Worker entry point: handle a batch of one kind, returning one result per item."""
+    handle = WORKERS[kind]
+    return [handle(item) for item in items]
+
+
+# --------------------------------------------------------------------------------
+# Event-loop side
+# --------------------------------------------------------------------------------
+class WorkerPool:
+    """
+    The process pool shared by every Batcher. A pool whose worker died is
+    broken for good, so restart() swaps in a new one.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.restarts = 0
+        self.executor = self._create()
+
+    def _create(self):
+        # Workers come from a fork server rather than from this process, so
+        # they don't inherit open client sockets, which would keep a closed
+        # connection open. Reseed each so they don't generate the same puzzles.
+        methods = multiprocessing.get_all_start_methods()
+        context = (
+            multiprocessing.get_context("forkserver")
+            if "forkserver" in methods
+            else None
+        )
+        return ProcessPoolExecutor(
+            self.workers, mp_context=context, initializer=random.seed
+        )
+
+    def restart(self, broken):
+        """Replace the executor, unless another batch already replaced `broken`."""
+        if self.executor is not broken:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.executor = self._create()
+        self.restarts += 1
+        print(
+            f"service: a worker died, pool restarted ({self.restarts})", file=sys.stderr
+        )
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+class Batcher:
+    """
+    Queue of pending requests of one kind. Once a request is waiting, run()
+    waits for a free worker slot, then sends everything queued (up to `limit`
+    items) as a single pool task and resolves each request's future from the
+    results. A batch the pool cannot run fails with 503 and the loop goes on.
+    """
+
+    def __init__(self, kind, pool, slots, limit, max_pending=MAX_PENDING):
+        self.kind = kind
+        self.pool = pool
+        self.slots = slots
+        self.limit = limit
+        self.queue = asyncio.Queue(max_pending)
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, item):
+        """Queue an item and return a future for its result. Raises HTTPError
+        503 if the queue is full."""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((item, future))
+        except asyncio.QueueFull:
+            raise HTTPError(
+                HTTPStatus.SERVICE_UNAVAILABLE, f"{self.kind} queue is full"
+            )
+        return future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            # Requests keep queueing while every worker is busy; they all go
+            # in this batch once one is free.
+            await self.slots.acquire()
+            while len(batch) < self.limit and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            # Requests that already timed out are dropped rather than computed.
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                self.slots.release()
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            executor = self.pool.executor
+            try:
+                task = loop.run_in_executor(
+                    executor, run_batch, self.kind, [item for item, _ in batch]
+                )
+            except Exception as e:  # broken or shut-down pool
+                self.slots.release()
+                self._fail(batch, self._error(e, executor))
+                continue
+            task.add_done_callback(
+                partial(self._deliver, batch=batch, executor=executor)
+            )
+
+    def _error(self, error, executor):
+        """The exception to hand the requests of a failed batch."""
+        if isinstance(error, BrokenExecutor):
+            self.pool.restart(executor)
+            return HTTPError(
+                HTTPStatus.SERVICE_UNAVAILABLE, "worker process died, retry"
+            )
+        if isinstance(error, RuntimeError):  # submitted while shutting down
+            return HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "service is shutting down")
+        return error
+
+    def _fail(self, batch, error):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    def _deliver(self, task, batch, executor):
+        self.slots.release()
+        if task.cancelled():
+            self._fail(batch, asyncio.CancelledError())
+            return
+        error = task.exception()
+        if error:
+            self._fail(batch, self._error(error, executor))
+            return
+        for (_, future), result in zip(batch, task.result()):
+            if not future.done():
+                future.set_result(result)
+
+
+def parse_grid(value):
+    """An 81-character grid string ('0' or '.' for empty) as a flat list of ints."""
+    if not isinstance(value, str) or len(value) != 81:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "grid must be an 81-character string")
+    grid = [0 if ch == "." else ord(ch) - 48 for ch in value]
+    if any(not 0 <= v <= 9 for v in grid):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "grid may only hold 0-9 and '.'")
+    return grid
+
+
+class Service:
+    """The HTTP front end: parses requests, routes them to a Batcher and
+    writes JSON responses."""
+
+    def __init__(self, pool, workers):
+        """pool: the WorkerPool running the batches; workers: its process count."""
+        slots = asyncio.Semaphore(workers)
+        self.pool = pool
+        self.batchers = {
+            kind: Batcher(kind, pool, slots, limit)
+            for kind, limit in BATCH_LIMITS.items()
+        }
+        self.started = time.monotonic()
+        self.requests = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def start(self):
+        return [asyncio.create_task(b.run()) for b in self.batchers.values()]
+
+    def stats(self):
+        return {
+            "uptime": round(time.monotonic() - self.started, 1),
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "pool_restarts": self.pool.restarts,
+            "endpoints": {
+                kind: {
+                    "queued": b.queue.qsize(),
+                    "batches": b.batches,
+                    "items": b.items,
+                    "mean_batch": round(b.items / b.batches, 2) if b.batches else 0,
+                }
+                for kind, b in self.batchers.items()
+            },
+        }
+
+    def _parse_request(self, method, path, query, body):
+        """Return (kind, item) for a computing endpoint."""
+        if path == "/generate":
+            if method not in ("GET", "POST"):
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+            difficulty = query.get("difficulty", ["medium"])[0]
+            if difficulty not in DIFFICULTY_REMOVALS:
+                raise HTTPError(
+                    HTTPStatus.BAD_REQUEST,
+                    f"difficulty must be one of {', '.join(DIFFICULTY_REMOVALS)}",
+                )
+            return "generate", difficulty
+        if path in ("/solve", "/validate"):
+            if method != "POST":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+            try:
+                data = json.loads(body)
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "body must be JSON")
+            key = "puzzle" if path == "/solve" else "grid"
+            if not isinstance(data, dict) or key not in data:
+                raise HTTPError(
+                    HTTPStatus.BAD_REQUEST, f'body must have a "{key}" field'
+                )
+            return path[1:], parse_grid(data[key])
+        raise HTTPError(HTTPStatus.NOT_FOUND)
+
+    async def dispatch(self, method, target, body):
+        """Handle one request. Returns (status, JSON-able payload)."""
+        self.requests += 1
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        if url.path == "/stats":
+            return HTTPStatus.OK, self.stats()
+        try:
+            timeout = float(query.get("timeout", [REQUEST_TIMEOUT])[0])
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "timeout must be a number")
+        if not math.isfinite(timeout):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "timeout must be a finite number")
+        kind, item = self._parse_request(method, url.path, query, body)
+        try:
+            future = self.batchers[kind].submit(item)
+        except HTTPError:
+            self.rejected += 1
+            raise
+        try:
+            result = await asyncio.wait_for(future, min(max(timeout, 0), MAX_TIMEOUT))
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise HTTPError(HTTPStatus.GATEWAY_TIMEOUT, f"{kind} timed out")
+        return HTTPStatus.OK, result
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    method, target, version = request_line.split(" ", 2)
+                    keep_alive = keep_alive and version == "HTTP/1.1"
+                    length = int(headers.get("content-length", 0))
+                    if length > MAX_BODY:
+                        keep_alive = False
+                        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self.dispatch(method, target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except ValueError:
+                    keep_alive = False
+                    status = HTTPStatus.BAD_REQUEST
+                    payload = {"error": "malformed request"}
+                except Exception as e:
+                    print(f"service: {e!r}", file=sys.stderr)
+                    status = HTTPStatus.INTERNAL_SERVER_ERROR
+                    payload = {"error": str(e)}
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def _response(status, payload, keep_alive):
+    body = json.dumps(payload).encode()
+    extra = "Retry-After: 1\r\n" if status == HTTPStatus.SERVICE_UNAVAILABLE else ""
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        f"{extra}\r\n"
+    )
+    return head.encode() + body
+
+
+async def serve(host=HOST, port=PORT, workers=None):
+    workers = workers or os.cpu_count()
+    pool = WorkerPool(workers)
+    try:
+        service = Service(pool, workers)
+        tasks = service.start()
+        server = await asyncio.start_server(service.handle_connection, host, port)
+        print(
+            f"serving on http://{host}:{port} with {workers} workers", file=sys.stderr
+        )
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+    finally:
+        pool.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the Sudoku engines over HTTP.")
+    parser.add_argument(
+        "--host", default=HOST, help="address to bind (default: localhost)"
+    )
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes (default: all cores)",
+    )
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
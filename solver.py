@@ -0,0 +1,319 @@
+import time
+
+# --------------------------------------------------------------------------------
+# Bitmask constraint-propagation solver
+#
+# The grid is handled internally as a flat list of 81 ints (0 = empty). Every
+# row, column and 3x3 box keeps a 9-bit mask of the digits it already holds,
+# so the candidates of a cell are a couple of ORs away instead of a rescan of
+# its row, column and box. Digit d is stored as bit (d - 1).
+# --------------------------------------------------------------------------------
+ALL_DIGITS = 0x1FF
+
+ROW_OF = [i // 9 for i in range(81)]
+COL_OF = [i % 9 for i in range(81)]
+BOX_OF = [(i // 27) * 3 + (i % 9) // 3 for i in range(81)]
+
+UNITS = (
+    [[r * 9 + c for c in range(9)] for r in range(9)]
+    + [[r * 9 + c for r in range(9)] for c in range(9)]
+    + [
+        [(b // 3 * 3 + i // 3) * 9 + b % 3 * 3 + i % 3 for i in range(9)]
+        for b in range(9)
+    ]
+)
+
+PEERS = [
+    sorted({j for unit in UNITS if i in unit for j in unit} - {i}) for i in range(81)
+]
+
+POPCOUNT = [bin(m).count("1") for m in range(512)]
+DIGIT_OF_BIT = {1 << d: d + 1 for d in range(9)}
+DIGITS_OF_MASK = [[d + 1 for d in range(9) if m >> d & 1] for m in range(512)]
+
+
+def flatten(board):
+    """Turn a 9x9 list of lists into a flat 81-element list."""
+    return [v for row in board for v in row]
+
+
+def unflatten(grid):
+    """Turn a flat 81-element list back into a 9x9 list of lists."""
+    return [list(grid[r * 9 : r * 9 + 9]) for r in range(9)]
+
+
+def build_masks(grid):
+    """
+    Build the row/column/box digit masks for a flat grid.
+    Returns (rows, cols, boxes), or None if the givens already clash.
+    """
+    rows = [0] * 9
+    cols = [0] * 9
+    boxes = [0] * 9
+    for i in range(81):
+        v = grid[i]
+        if v:
+            bit = 1 << (v - 1)
+            r, c, b = ROW_OF[i], COL_OF[i], BOX_OF[i]
+            if (rows[r] | cols[c] | boxes[b]) & bit:
+                return None
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+    return rows, cols, boxes
+
+
+def _undo(grid, rows, cols, boxes, trail):
+    """Clear every cell recorded in trail and give its digit back to the masks."""
+    for i in trail:
+        bit = 1 << (grid[i] - 1)
+        rows[ROW_OF[i]] ^= bit
+        cols[COL_OF[i]] ^= bit
+        boxes[BOX_OF[i]] ^= bit
+        grid[i] = 0
+    del trail[:]
+
+
+def _propagate(grid, rows, cols, boxes, trail):
+    """
+    Place naked and hidden singles until nothing changes.
+    Every placed cell is appended to trail. Returns False on a contradiction.
+    """
+    while True:
+        changed = False
+        # Naked singles: cells with exactly one candidate left.
+        for i in range(81):
+            if grid[i]:
+                continue
+            r, c, b = ROW_OF[i], COL_OF[i], BOX_OF[i]
+            m = ~(rows[r] | cols[c] | boxes[b]) & ALL_DIGITS
+            if not m:
+                return False
+            if not m & (m - 1):
+                grid[i] = DIGIT_OF_BIT[m]
+                rows[r] |= m
+                cols[c] |= m
+                boxes[b] |= m
+                trail.append(i)
+                changed = True
+        if changed:
+            continue
+
+        # Hidden singles: digits with exactly one possible cell in a unit.
+        for unit in UNITS:
+            once = twice = placed = 0
+            for i in unit:
+                v = grid[i]
+                if v:
+                    placed |= 1 << (v - 1)
+                else:
+                    m = (
+                        ~(rows[ROW_OF[i]] | cols[COL_OF[i]] | boxes[BOX_OF[i]])
+                        & ALL_DIGITS
+                    )
+                    twice |= once & m
+                    once |= m
+            if (once | placed) != ALL_DIGITS:
+                return False
+            singles = once & ~twice & ~placed
+            if not singles:
+                continue
+            for i in unit:
+                if grid[i]:
+                    continue
+                r, c, b = ROW_OF[i], COL_OF[i], BOX_OF[i]
+                bit = ~(rows[r] | cols[c] | boxes[b]) & singles
+                if not bit:
+                    continue
+                if bit & (bit - 1):
+                    return False
+                grid[i] = DIGIT_OF_BIT[bit]
+                rows[r] |= bit
+                cols[c] |= bit
+                boxes[b] |= bit
+                trail.append(i)
+                changed = True
+        if not changed:
+            return True
+
+
+def search(grid, rows, cols, boxes, limit=1, rng=None, solutions=None):
+    """
+    Depth-first search over a flat grid and its masks.
+
+    Propagates singles, then branches on the most-constrained empty cell.
+    Stops once `limit` solutions have been found and returns how many were.
+    Solved grids are appended to `solutions` when a list is given. The grid
+    and masks are restored to their original state before returning.
+    If rng is given, candidate digits are tried in shuffled order.
+    """
+    trail = []
+    if not _propagate(grid, rows, cols, boxes, trail):
+        _undo(grid, rows, cols, boxes, trail)
+        return 0
+
+    best = -1
+    best_mask = 0
+    best_count = 10
+    for i in range(81):
+        if grid[i]:
+            continue
+        m = ~(rows[ROW_OF[i]] | cols[COL_OF[i]] | boxes[BOX_OF[i]]) & ALL_DIGITS
+        n = POPCOUNT[m]
+        if n < best_count:
+            best, best_mask, best_count = i, m, n
+            if n == 2:
+                break
+
+    if best < 0:
+        if solutions is not None:
+            solutions.append(grid[:])
+        _undo(grid, rows, cols, boxes, trail)
+        return 1
+
+    digits = DIGITS_OF_MASK[best_mask]
+    if rng is not None:
+        digits = digits[:]
+        rng.shuffle(digits)
+
+    r, c, b = ROW_OF[best], COL_OF[best], BOX_OF[best]
+    found = 0
+    for d in digits:
+        bit = 1 << (d - 1)
+        grid[best] = d
+        rows[r] |= bit
+        cols[c] |= bit
+        boxes[b] |= bit
+        found += search(grid, rows, cols, boxes, limit - found, rng, solutions)
+        rows[r] ^= bit
+        cols[c] ^= bit
+        boxes[b] ^= bit
+        grid[best] = 0
+        if found >= limit:
+            break
+
+    _undo(grid, rows, cols, boxes, trail)
+    return found
+
+
+def solve(board, rng=None):
+    """
+    Solve a 9x9 board and return the solution as a new 9x9 list,
+    or None if the board has no solution.
+    """
+    grid = flatten(board)
+    masks = build_masks(grid)
+    if masks is None:
+        return None
+    solutions = []
+    search(grid, *masks, limit=1, rng=rng, solutions=solutions)
+    return unflatten(solutions[0]) if solutions else None
+
+
+def solve_in_place(board, rng=None):
+    """Fill a 9x9 board in-place with a valid solution. Returns True on success."""
+    solution = solve(board, rng)
+    if solution is None:
+        return False
+    for r in range(9):
+        board[r][:] = solution[r]
+    return True
+
+
+def count_solutions(board, limit=2):
+    """Count the solutions of a 9x9 board, stopping as soon as `limit` are found."""
+    grid = flatten(board)
+    masks = build_masks(grid)
+    if masks is None:
+        return 0
+    return search(grid, *masks, limit=limit)
+
+
+# --------------------------------------------------------------------------------
+# Timing comparison against the original recursive backtracker
+# --------------------------------------------------------------------------------
+BENCH_PUZZLES = {
+    "easy": (
+        "530070000600195000098000060"
+        "800060003400803001700020006"
+        "060000280000419005000080079"
+    ),
+    "escargot": (
+        "100007090030020008009600500"
+        "005300900010080002600004000"
+        "300000010040000007007000300"
+    ),
+    "inkala": (
+        "800000000003600000070090200"
+        "050007000000045700000100030"
+        "001000068008500010090000400"
+    ),
+}
+
+
+def _reference_valid(board, row, col, num):
+    for i in range(9):
+        if board[row][i] == num or board[i][col] == num:
+            return False
+    box_x = (col // 3) * 3
+    box_y = (row // 3) * 3
+    for i in range(3):
+        for j in range(3):
+            if board[box_y + i][box_x + j] == num:
+                return False
+    return True
+
+
+def _reference_solve(board):
+    """The original board.solve_board, without the shuffle, for comparison."""
+    for row in range(9):
+        for col in range(9):
+            if board[row][col] == 0:
+                for num in range(1, 10):
+                    if _reference_valid(board, row, col, num):
+                        board[row][col] = num
+                        if _reference_solve(board):
+                            return True
+                        board[row][col] = 0
+                return False
+    return True
+
+
+def parse_puzzle(text):
+    """Parse an 81-character puzzle string ('0' or '.' for empty) into a 9x9 board."""
+    digits = [0 if ch in "0." else int(ch) for ch in text.strip()]
+    return unflatten(digits)
+
+
+def format_puzzle(board):
+    """Format a 9x9 board as an 81-character string with '0' for empty cells."""
+    return "".join(str(v) for row in board for v in row)
+
+
+def compare(names=tuple(BENCH_PUZZLES), repeat=3):
+    """Print the time taken by the reference and bitmask solvers on each puzzle."""
+    print(f"{'puzzle':<10}{'reference':>14}{'bitmask':>14}{'speedup':>10}")
+    for name in names:
+        puzzle = parse_puzzle(BENCH_PUZZLES[name])
+
+        start = time.perf_counter()
+        board = [row[:] for row in puzzle]
+        _reference_solve(board)
+        ref = time.perf_counter() - start
+
+        fast = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            solution = solve(puzzle)
+            fast = min(fast, time.perf_counter() - start)
+        assert solution == board, "solvers disagree"
+
+        print(
+            f"{name:<10}{ref * 1000:>12.1f}ms{fast * 1000:>12.2f}ms{ref / fast:>9.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    import sys
+
+    compare(sys.argv[1:] or tuple(BENCH_PUZZLES))
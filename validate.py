@@ -0,0 +1,205 @@
+"""
+Vectorized validation of many grids at once (requires numpy).
+
+    python3 validate.py puzzles.txt --field 2     # check batch.py solutions
+    python3 validate.py grids.txt --chunk 500000
+
+Grids are (N, 81) uint8 arrays with 0 for empty cells. Each digit becomes a
+bit (digit d -> bit d-1), so a unit holds a duplicate exactly when some bit
+is set in two of its cells. Duplicates are found for all 27 units of every
+grid with vectorized OR/AND passes over blocks of grids instead of per-cell
+Python loops.
+"""
+
+import argparse
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from solver import UNITS
+
+ValidationResult = namedtuple("ValidationResult", "valid complete conflicts")
+ValidationResult.__doc__ = """Per-grid results of validate_grids.
+valid: (N,) bool, every value is 0-9 and no unit repeats a digit.
+complete: (N,) bool, valid and no empty cells.
+conflicts: (N, 81) bool, cells whose digit is repeated in one of their units
+(None if locate=False)."""
+
+# The row, column and box (indices into UNITS) containing each cell.
+CELL_UNITS = [[u for u in range(27) if cell in UNITS[u]] for cell in range(81)]
+
+# Grids are validated in blocks of this many, so the working set of the
+# per-cell passes stays in cache.
+BLOCK = 16384
+
+DEFAULT_CHUNK = 1 << 18
+
+_ONE = np.uint16(1)
+ALL_BITS = np.uint16(0x1FF)
+
+
+def as_grids(grids):
+    """Coerce 9x9 boards, 81-element lists or an existing array into (N, 81) uint8."""
+    return np.ascontiguousarray(grids, dtype=np.uint8).reshape(-1, 81)
+
+
+def validate_grids(grids, locate=True):
+    """Validate an (N, 81) uint8 array of grids. Returns a ValidationResult."""
+    grids = as_grids(grids)
+    n = len(grids)
+    valid = np.empty(n, dtype=bool)
+    complete = np.empty(n, dtype=bool)
+    conflicts = np.empty((n, 81), dtype=bool) if locate else None
+    for start in range(0, n, BLOCK):
+        block = slice(start, start + BLOCK)
+        _validate_block(grids[block], valid[block], complete[block], conflicts, start)
+    return ValidationResult(valid, complete, conflicts)
+
+
+def _validate_block(grids, valid, complete, conflicts, start):
+    # Cell-major layout: cells[i] holds cell i of every grid contiguously, so
+    # each pass below is one vectorized operation over the whole block.
+    cells = np.ascontiguousarray(grids.T)
+    in_range = cells.max(axis=0) <= 9
+    filled = cells.min(axis=0) != 0
+    # (1 << v) >> 1 maps 0 to no bit and digit d to bit d-1; out-of-range
+    # values are clamped to 10 and masked off.
+    bits = np.left_shift(_ONE, np.minimum(cells, 10), dtype=np.uint16)
+    bits >>= 1
+    bits &= ALL_BITS
+
+    n = len(grids)
+    twice = np.zeros((len(UNITS), n), dtype=np.uint16)
+    once = np.empty(n, dtype=np.uint16)
+    both = np.empty(n, dtype=np.uint16)
+    for u, unit in enumerate(UNITS):
+        repeated = twice[u]
+        once[:] = bits[unit[0]]
+        for i in unit[1:]:
+            np.bitwise_and(once, bits[i], out=both)
+            repeated |= both
+            once |= bits[i]
+
+    np.logical_and(in_range, ~twice.any(axis=0), out=valid)
+    np.logical_and(valid, filled, out=complete)
+    if conflicts is not None:
+        for i in range(81):
+            repeated = twice[CELL_UNITS[i][0]] | twice[CELL_UNITS[i][1]]
+            repeated |= twice[CELL_UNITS[i][2]]
+            conflicts[start : start + n, i] = (bits[i] & repeated) != 0
+
+
+def read_grids(lines, field=0, chunk_size=DEFAULT_CHUNK, skipped=None):
+    """
+    Yield (N, 81) uint8 arrays of at most chunk_size grids from text lines.
+    `field` picks the whitespace-separated column holding the 81-character
+    grid ('0' or '.' for empty), so batch.py output can be read directly.
+    See read_numbered_grids for which lines are skipped.
+    """
+    for _, grids in read_numbered_grids(lines, field, chunk_size, skipped):
+        yield grids
+
+
+def read_numbered_grids(lines, field=0, chunk_size=DEFAULT_CHUNK, skipped=None):
+    """
+    Like read_grids, but yield (line_numbers, grids) pairs, where
+    line_numbers holds the 1-based input line of each grid. Blank lines are
+    ignored. Lines whose field is not an 81-character ASCII grid (comments,
+    truncated lines, ...) are skipped too, and their line numbers added to
+    `skipped` if it is a list (in chunk order, not necessarily sorted).
+    """
+    batch = []
+    gaps = []  # batch position of each line dropped since the chunk's first line
+    first = 1  # line number of the chunk's first line
+    for number, line in enumerate(lines, 1):
+        parts = line.split()
+        try:
+            batch.append(parts[field].encode("ascii"))
+        except (IndexError, UnicodeEncodeError):
+            if parts and skipped is not None:
+                skipped.append(number)
+            gaps.append(len(batch))
+            continue
+        if len(batch) >= chunk_size:
+            yield _numbered_chunk(first, batch, gaps, skipped)
+            batch = []
+            gaps = []
+            first = number + 1
+    if batch:
+        yield _numbered_chunk(first, batch, gaps, skipped)
+
+
+def _numbered_chunk(first, rows, gaps, skipped):
+    """Parse one chunk of encoded grids read from line `first` on, with a line
+    dropped before batch position p for every p in `gaps`."""
+    positions = np.arange(len(rows))
+    numbers = first + positions + np.searchsorted(gaps, positions, side="right")
+    if set(map(len, rows)) != {81}:
+        # Rare: drop the rows that are not 81 characters long.
+        keep = np.array([len(row) == 81 for row in rows], dtype=bool)
+        if skipped is not None:
+            skipped.extend(numbers[~keep].tolist())
+        numbers = numbers[keep]
+        rows = [row for row, ok in zip(rows, keep) if ok]
+    return numbers, _parse_chunk(rows)
+
+
+def _parse_chunk(rows):
+    grids = np.frombuffer(b"".join(rows), dtype=np.uint8).reshape(-1, 81) - ord("0")
+    grids[grids == (ord(".") - ord("0")) % 256] = 0
+    return grids
+
+
+def validate_stream(chunks, locate=False):
+    """Validate an iterable of grid chunks, yielding one ValidationResult per chunk,
+    so memory stays bounded by the chunk size."""
+    for grids in chunks:
+        yield validate_grids(grids, locate)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate Sudoku grids in bulk.")
+    parser.add_argument("input", help="file with one grid per line ('-' for stdin)")
+    parser.add_argument(
+        "--field", type=int, default=0, help="whitespace column holding the grid"
+    )
+    parser.add_argument(
+        "--chunk", type=int, default=DEFAULT_CHUNK, help="grids validated per chunk"
+    )
+    args = parser.parse_args(argv)
+
+    src = sys.stdin if args.input == "-" else open(args.input)
+    total = valid = complete = 0
+    invalid_lines = []
+    skipped = []
+    start = time.perf_counter()
+    try:
+        for numbers, grids in read_numbered_grids(src, args.field, args.chunk, skipped):
+            result = validate_grids(grids, locate=False)
+            if len(invalid_lines) < 10:
+                bad = numbers[~result.valid][: 10 - len(invalid_lines)]
+                invalid_lines.extend(bad.tolist())
+            total += len(grids)
+            valid += int(result.valid.sum())
+            complete += int(result.complete.sum())
+    finally:
+        if src is not sys.stdin:
+            src.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"{total} grids: {valid} valid, {complete} complete, {total - valid} invalid")
+    if invalid_lines:
+        print("first invalid grids on lines: " + ", ".join(map(str, invalid_lines)))
+    if skipped:
+        print(
+            f"{len(skipped)} lines skipped, not a grid: "
+            + ", ".join(map(str, sorted(skipped)[:10]))
+            + (", ..." if len(skipped) > 10 else "")
+        )
+    print(f"{total / elapsed:.0f} grids/sec (including parsing)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()